@@ -0,0 +1,26 @@
+"""add users created_at id index
+
+Revision ID: 5d7a0c3e9b16
+Revises: 9f2c6d1e8a43
+Create Date: 2026-10-18 11:24:06.381204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d7a0c3e9b16'
+down_revision: Union[str, None] = '9f2c6d1e8a43'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_created_at_id', table_name='users')
@@ -0,0 +1,26 @@
+"""add user token version
+
+Revision ID: 9f2c6d1e8a43
+Revises: 3b8e41a9c2d7
+Create Date: 2026-10-18 10:03:17.552931
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9f2c6d1e8a43'
+down_revision: Union[str, None] = '3b8e41a9c2d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'token_version')
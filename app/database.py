@@ -1,21 +1,205 @@
+from builtins import Exception, bool, dict, float, hasattr, int, len, max, next, str
+import itertools
+import uuid
+import time
+from typing import Dict, List, Optional
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from app.utils.metrics import metrics
+import logging
+
+logger = logging.getLogger(__name__)
 
 Base = declarative_base()
 
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long callers wait to check out a connection."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.acquire_count = 0
+        self.acquire_wait_total = 0.0
+        self.acquire_wait_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            metrics.increment("db.pool.timeouts")
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.acquire_count += 1
+            self.acquire_wait_total += waited
+            self.acquire_wait_max = max(self.acquire_wait_max, waited)
+
+class Replica:
+    """A read replica engine together with its passive health state."""
+    def __init__(self, url: str, engine, session_factory):
+        self.url = url
+        self.engine = engine
+        self.session_factory = session_factory
+        self.unhealthy_until = 0.0
+
+    def is_healthy(self, now: float) -> bool:
+        return self.unhealthy_until <= now
+
 class Database:
     """Handles database connections and sessions."""
     _engine = None
     _session_factory = None
+    _engine_options: Dict = {}
+    _replicas: List[Replica] = []
+    _replica_cursor = itertools.count()
+    _replica_cooldown = 10.0
+    _read_your_writes_window = 5.0
+    _sticky_users: Dict[str, float] = {}
 
     @classmethod
-    def initialize(cls, database_url: str, echo: bool = False):
+    def initialize(
+        cls,
+        database_url: str,
+        echo: bool = False,
+        pool_size: int = 5,
+        max_overflow: int = 10,
+        pool_timeout: float = 30.0,
+        pool_recycle: int = -1,
+        pool_pre_ping: bool = False,
+        statement_cache_size: int = 100,
+        command_timeout: Optional[float] = None,
+    ):
         """Initialize the async engine and sessionmaker."""
         if cls._engine is None:  # Ensure engine is created once
-            cls._engine = create_async_engine(database_url, echo=echo, future=True)
-            cls._session_factory = sessionmaker(
-                bind=cls._engine, class_=AsyncSession, expire_on_commit=False, future=True
+            cls._engine_options = dict(
+                echo=echo,
+                pool_size=pool_size,
+                max_overflow=max_overflow,
+                pool_timeout=pool_timeout,
+                pool_recycle=pool_recycle,
+                pool_pre_ping=pool_pre_ping,
+                statement_cache_size=statement_cache_size,
+                command_timeout=command_timeout,
             )
+            cls._engine = cls._create_engine(database_url)
+            cls._session_factory = cls._create_session_factory(cls._engine)
+            for name in ("size", "checked_out", "overflow", "acquire_wait_avg_ms", "acquire_wait_max_ms"):
+                metrics.register_gauge(f"db.pool.{name}", lambda name=name: cls.pool_status().get(name, 0))
+
+    @classmethod
+    def _create_engine(cls, database_url: str):
+        options = dict(cls._engine_options)
+        statement_cache_size = options.pop("statement_cache_size", 100)
+        command_timeout = options.pop("command_timeout", None)
+        connect_args = {}
+        if database_url.startswith("postgresql+asyncpg"):
+            # SQLAlchemy's adapter prepares statements through its own LRU (prepared_statement_cache_size);
+            # asyncpg's statement_cache_size only covers asyncpg's internal cache, so both are set
+            connect_args = {
+                "statement_cache_size": statement_cache_size,
+                "prepared_statement_cache_size": statement_cache_size,
+                "command_timeout": command_timeout,
+            }
+            if statement_cache_size == 0:
+                # Behind a transaction-pooling pgbouncer, statements still prepared per execution must
+                # not reuse names another client's server connection may already hold
+                connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid.uuid4()}__"
+        return create_async_engine(
+            database_url, future=True, poolclass=InstrumentedQueuePool, connect_args=connect_args, **options
+        )
+
+    @staticmethod
+    def _create_session_factory(engine):
+        return sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False, future=True)
+
+    @classmethod
+    def initialize_replicas(cls, replica_urls: List[str], read_your_writes_seconds: float = 5.0, unhealthy_cooldown_seconds: float = 10.0):
+        """Create an engine per read replica, reusing the primary's pool options. Call after `initialize()`."""
+        if cls._replicas or not replica_urls:
+            return
+        cls._read_your_writes_window = read_your_writes_seconds
+        cls._replica_cooldown = unhealthy_cooldown_seconds
+        for url in replica_urls:
+            engine = cls._create_engine(url)
+            cls._replicas.append(Replica(url, engine, cls._create_session_factory(engine)))
+        metrics.register_gauge("db.replicas.healthy", lambda: len(cls.healthy_replicas()))
+
+    @classmethod
+    def session_factory_for(cls, session: AsyncSession):
+        """The sessionmaker for the database `session` talks to, for work that must outlive the request that started it."""
+        bind = session.bind
+        if bind is cls._engine and cls._session_factory is not None:
+            return cls._session_factory
+        for replica in cls._replicas:
+            if bind is replica.engine:
+                return replica.session_factory
+        return cls._create_session_factory(bind)
+
+    @classmethod
+    def is_replica_session(cls, session: AsyncSession) -> bool:
+        """Whether `session` reads from a replica, which may still be behind the primary."""
+        return any(session.bind is replica.engine for replica in cls._replicas)
+
+    @classmethod
+    def healthy_replicas(cls) -> List[Replica]:
+        now = time.monotonic()
+        return [replica for replica in cls._replicas if replica.is_healthy(now)]
+
+    @classmethod
+    def choose_replica(cls, sticky_until: Optional[float] = None, sticky_key: Optional[str] = None) -> Optional[Replica]:
+        """
+        Pick the next healthy replica in round-robin order.
+
+        Returns None, meaning "read from the primary", when no replica is configured or healthy, when
+        `sticky_until` (a marker from `mark_write`, carried back by the client) has not passed yet, or
+        when `sticky_key` wrote within the read-your-writes window.
+        """
+        if cls.is_sticky(sticky_until) or (sticky_key is not None and cls.is_sticky(cls._sticky_users.get(sticky_key))):
+            metrics.increment("db.reads.primary_sticky")
+            return None
+        now = time.monotonic()
+        healthy = [replica for replica in cls._replicas if replica.is_healthy(now)]
+        if not healthy:
+            return None
+        metrics.increment("db.reads.replica")
+        return healthy[next(cls._replica_cursor) % len(healthy)]
+
+    @classmethod
+    def mark_replica_unhealthy(cls, replica: Replica):
+        """Take a replica out of rotation for the configured cooldown."""
+        replica.unhealthy_until = time.monotonic() + cls._replica_cooldown
+        metrics.increment("db.replicas.failures")
+
+    @classmethod
+    def mark_write(cls, sticky_key: Optional[str] = None) -> float:
+        """
+        Start the read-your-writes window of a client that just wrote and return when it ends, as a
+        wall-clock timestamp. The client carries it back with its next requests, so whichever worker
+        serves them keeps its reads on the primary. `sticky_key`, the writer's user id, is also
+        remembered here for clients that don't carry the marker (see `mark_sticky`).
+        """
+        sticky_until = time.time() + cls._read_your_writes_window
+        if sticky_key is not None:
+            cls.mark_sticky(sticky_key, sticky_until)
+        return sticky_until
+
+    @classmethod
+    def mark_sticky(cls, sticky_key: str, sticky_until: float):
+        """Route the reads of `sticky_key` to the primary until `sticky_until`, e.g. after a write another worker announced."""
+        if sticky_until > cls._sticky_users.get(sticky_key, 0.0):
+            cls._sticky_users[sticky_key] = sticky_until
+        if len(cls._sticky_users) > 10000:
+            now = time.time()
+            cls._sticky_users = {key: until for key, until in cls._sticky_users.items() if until > now}
+
+    @classmethod
+    def is_sticky(cls, sticky_until: Optional[float]) -> bool:
+        """Whether a `mark_write` marker is still running; markers further out than one window are forged and ignored."""
+        if sticky_until is None:
+            return False
+        now = time.time()
+        return now < sticky_until <= now + cls._read_your_writes_window
 
     @classmethod
     def get_session_factory(cls):
@@ -23,3 +207,79 @@ class Database:
         if cls._session_factory is None:
             raise ValueError("Database not initialized. Call `initialize()` first.")
         return cls._session_factory
+
+    @classmethod
+    def pool_status(cls) -> dict:
+        """Return a snapshot of connection pool saturation and checkout wait times."""
+        if cls._engine is None:
+            return {}
+        pool = cls._engine.pool
+        count = pool.acquire_count
+        return {
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "max_overflow": pool._max_overflow,
+            "acquire_count": count,
+            "acquire_wait_avg_ms": pool.acquire_wait_total / count * 1000 if count else 0.0,
+            "acquire_wait_max_ms": pool.acquire_wait_max * 1000,
+            "timeouts": metrics.get("db.pool.timeouts"),
+        }
+
+# Unit of work: a request-scoped session flagged by `begin_unit_of_work` collects the writes of the
+# whole request and commits them once, in `finish_unit_of_work`. Sessions that aren't flagged (scripts,
+# background tasks, tests) keep committing each write immediately.
+
+def begin_unit_of_work(session: AsyncSession):
+    """Mark a session as owned by a request-scoped unit of work."""
+    session.info["unit_of_work"] = True
+    session.info["has_writes"] = False
+    session.info["after_commit"] = []
+
+def session_target(session: AsyncSession) -> str:
+    """The database a session talks to (the primary or one replica), for keying work shared between requests."""
+    bind = session.bind
+    return bind.url.render_as_string(hide_password=True) if bind is not None else ""
+
+def in_unit_of_work(session: AsyncSession) -> bool:
+    return session.info.get("unit_of_work", False)
+
+async def commit_write(session: AsyncSession):
+    """Persist pending writes: flush them into the unit of work, or commit right away outside of one."""
+    if in_unit_of_work(session):
+        await session.flush()
+        session.info["has_writes"] = True
+    else:
+        await session.commit()
+
+async def rollback_write(session: AsyncSession):
+    """Roll back a failed write, discarding everything the unit of work had staged."""
+    await session.rollback()
+    if in_unit_of_work(session):
+        session.info["has_writes"] = False
+        session.info["after_commit"] = []
+
+async def after_commit(session: AsyncSession, callback):
+    """Run `callback` once the session's writes are committed; immediately if they already are."""
+    if in_unit_of_work(session):
+        session.info["after_commit"].append(callback)
+    else:
+        result = callback()
+        if result is not None and hasattr(result, "__await__"):
+            await result
+
+async def finish_unit_of_work(session: AsyncSession):
+    """Commit the unit of work if anything was written, then run the after-commit callbacks."""
+    if not session.info.get("has_writes"):
+        return
+    await session.commit()
+    session.info["has_writes"] = False
+    callbacks, session.info["after_commit"] = session.info["after_commit"], []
+    for callback in callbacks:
+        try:
+            result = callback()
+            if result is not None and hasattr(result, "__await__"):
+                await result
+        except Exception as e:
+            logger.error(f"After-commit callback failed: {e}")
@@ -1,14 +1,28 @@
-from builtins import Exception, dict, str
-from fastapi import Depends, HTTPException
+from builtins import Exception, KeyError, OSError, ValueError, dict, float, int, isinstance, str
+import logging
+import time
+from typing import Optional
+from uuid import UUID
+from fastapi import Depends, HTTPException, Request, Response
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.database import Database
+from app.database import Database, begin_unit_of_work, finish_unit_of_work
 from app.utils.template_manager import TemplateManager
 from app.services.email_service import EmailService
-from app.services.jwt_service import decode_token
+from app.services.jwt_service import decode_token_cached
+from app.services.token_version_service import TokenVersionService
+from app.utils.admission import AdmissionRejectedError, get_admission_controller
+from app.utils.invalidation_bus import invalidation_bus
+from app.utils.security import HashingQueueFullError
 from settings.config import Settings
 from fastapi import Depends
 
+logger = logging.getLogger(__name__)
+
+# Carries the end of a client's read-your-writes window between requests, so every worker honours it
+READ_YOUR_WRITES_COOKIE = "read_your_writes_until"
+
 def get_settings() -> Settings:
     """Return application settings."""
     return Settings()
@@ -18,35 +32,130 @@ def get_email_service() -> EmailService:
     return EmailService(template_manager=template_manager)
 
 async def get_db() -> AsyncSession:
-    """Dependency that provides a database session for each request."""
+    """
+    Dependency that provides a database session for each request.
+
+    The session is a unit of work: services stage their writes and the request commits them once at
+    the end. Writes made before a deliberate client error (4xx `HTTPException`, e.g. a failed login
+    attempt) are kept; anything else rolls the request back. A full password-hashing queue is re-raised
+    as is, so it still reaches the 503 handler.
+    """
     async_session_factory = Database.get_session_factory()
     async with async_session_factory() as session:
+        begin_unit_of_work(session)
         try:
             yield session
+        except HTTPException as e:
+            if e.status_code < 500:
+                await finish_unit_of_work(session)
+            raise
+        except HashingQueueFullError:
+            # Load shedding: the app's handler answers 503 with Retry-After
+            await session.rollback()
+            raise
         except Exception as e:
+            await session.rollback()
             raise HTTPException(status_code=500, detail=str(e))
-        
+        else:
+            await finish_unit_of_work(session)
+
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
 
-def get_current_user(token: str = Depends(oauth2_scheme)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
     credentials_exception = HTTPException(
         status_code=401,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    payload = decode_token(token)
+    payload = decode_token_cached(token)
     if payload is None:
         raise credentials_exception
     user_id: str = payload.get("sub")
     user_role: str = payload.get("role")
     if user_id is None or user_role is None:
         raise credentials_exception
+    # Tokens carry the user's id and token version; a bumped version revokes them. A token without
+    # them could never be revoked by a password reset or lockout, so it isn't accepted at all.
+    user_uid = payload.get("uid")
+    token_version = payload.get("token_version")
+    if user_uid is None or token_version is None:
+        raise credentials_exception
+    try:
+        current_version = await TokenVersionService.get_version(db, UUID(user_uid))
+    except ValueError:
+        raise credentials_exception
+    if current_version is None or current_version != token_version:
+        raise credentials_exception
     return {"user_id": user_id, "role": user_role}
 
+def mark_write(response: Response, user_id: str):
+    """
+    Keep the writer's reads on the primary for the read-your-writes window, on every worker: through
+    a cookie for clients that keep one, and by user id for those that don't. The user id is announced
+    on the invalidation bus, so while the bus is down only the cookie reaches the other workers.
+    """
+    sticky_until = Database.mark_write(user_id)
+    invalidation_bus.publish("read_your_writes", user_id, int(sticky_until * 1000))
+    response.set_cookie(
+        READ_YOUR_WRITES_COOKIE, f"{sticky_until:.3f}", max_age=int(sticky_until - time.time()) + 1,
+        httponly=True, samesite="lax",
+    )
+
+def _mark_sticky(user_id: str, sticky_until_ms: Optional[int]):
+    if sticky_until_ms is not None:
+        Database.mark_sticky(user_id, sticky_until_ms / 1000)
+
+invalidation_bus.subscribe("read_your_writes", _mark_sticky)
+
+def _sticky_until(request: Request) -> Optional[float]:
+    try:
+        return float(request.cookies[READ_YOUR_WRITES_COOKIE])
+    except (KeyError, ValueError):
+        return None
+
+async def get_read_db(request: Request, db: AsyncSession = Depends(get_db), current_user: dict = Depends(get_current_user)) -> AsyncSession:
+    """
+    Dependency that provides a session for read-only work, served by a read replica when one is healthy.
+
+    Falls back to the request's primary session when no replica is available or when the client or
+    its user wrote within the read-your-writes window (see `mark_write`). A connection failure takes
+    the replica out of rotation.
+    """
+    replica = Database.choose_replica(_sticky_until(request), current_user["user_id"])
+    if replica is None:
+        yield db
+        return
+    async with replica.session_factory() as session:
+        try:
+            yield session
+        except (DBAPIError, OSError) as e:
+            if isinstance(e, (OSError, OperationalError, InterfaceError)) or e.connection_invalidated:
+                logger.warning("Read replica %s failed, taking it out of rotation: %s", replica.url, e)
+                Database.mark_replica_unhealthy(replica)
+            raise
+
 def require_role(role: str):
     def role_checker(current_user: dict = Depends(get_current_user)):
         if current_user["role"] not in role:
             raise HTTPException(status_code=403, detail="Operation not permitted")
         return current_user
     return role_checker
+
+def limit_concurrency(route_class: str):
+    """Admit the request through the admission controller of `route_class`, answering 503 when it is shed."""
+    async def admission_guard():
+        controller = get_admission_controller(route_class)
+        try:
+            await controller.acquire()
+        except AdmissionRejectedError:
+            raise HTTPException(
+                status_code=503,
+                detail="Server is busy, please retry shortly.",
+                headers={"Retry-After": str(get_settings().admission_retry_after_seconds)},
+            )
+        try:
+            yield
+        finally:
+            controller.release()
+    return admission_guard
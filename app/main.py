@@ -1,10 +1,14 @@
-from builtins import Exception
+from builtins import Exception, str
 from fastapi import FastAPI
 from starlette.responses import JSONResponse
 from app.database import Database
 from app.dependencies import get_settings
-from app.routers import user_routes
+from app.routers import admin_routes, user_routes
+from app.services.last_login_service import LastLoginService
 from app.utils.api_description import getDescription
+from app.utils.invalidation_bus import PostgresChannel, invalidation_bus
+from app.utils.link_generation import compile_link_templates
+from app.utils.security import HashingQueueFullError, calibrate_bcrypt_rounds, set_bcrypt_rounds, set_rehash_tolerance, shutdown_password_hasher
 app = FastAPI(
     title="User Management",
     description=getDescription(),
@@ -20,12 +24,49 @@ app = FastAPI(
 @app.on_event("startup")
 async def startup_event():
     settings = get_settings()
-    Database.initialize(settings.database_url, settings.debug)
+    Database.initialize(
+        settings.database_url,
+        settings.debug,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        statement_cache_size=settings.db_statement_cache_size,
+        command_timeout=settings.db_command_timeout,
+    )
+    Database.initialize_replicas(
+        settings.database_replica_urls,
+        settings.replica_read_your_writes_seconds,
+        settings.replica_unhealthy_cooldown_seconds,
+    )
+    set_bcrypt_rounds(settings.bcrypt_rounds or calibrate_bcrypt_rounds(
+        settings.bcrypt_target_ms, settings.bcrypt_min_rounds, settings.bcrypt_max_rounds
+    ))
+    # A pinned cost is the same on every host; a calibrated one may differ by a step between workers
+    set_rehash_tolerance(0 if settings.bcrypt_rounds else settings.bcrypt_rehash_tolerance)
+    compile_link_templates(app)
+    LastLoginService.configure(settings.last_login_flush_interval_seconds, settings.last_login_flush_size, settings.last_login_max_pending)
+    LastLoginService.start()
+    if settings.cache_invalidation_enabled:
+        invalidation_bus.configure(settings.cache_invalidation_min_backoff_seconds, settings.cache_invalidation_max_backoff_seconds)
+        invalidation_bus.start(lambda: PostgresChannel(settings.database_url, settings.cache_invalidation_channel))
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await LastLoginService.stop()
+    await invalidation_bus.stop()
+    shutdown_password_hasher()
+
+@app.exception_handler(HashingQueueFullError)
+async def hashing_queue_full_handler(request, exc):
+    return JSONResponse(status_code=503, content={"message": "Server is busy, please retry shortly."}, headers={"Retry-After": str(get_settings().admission_retry_after_seconds)})
 
 @app.exception_handler(Exception)
 async def exception_handler(request, exc):
     return JSONResponse(status_code=500, content={"message": "An unexpected error occurred."})
 
 app.include_router(user_routes.router)
+app.include_router(admin_routes.router)
 
 
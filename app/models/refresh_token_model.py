@@ -0,0 +1,27 @@
+from datetime import datetime
+import uuid
+from sqlalchemy import Column, String, DateTime, ForeignKey, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base
+
+class RefreshToken(Base):
+    """
+    Server-side state of an issued refresh token, corresponding to the 'refresh_tokens' table.
+    Only a SHA-256 digest of the token is stored. Tokens that descend from the same login share a
+    `family_id`, so presenting an already rotated token can revoke the whole chain at once.
+    """
+    __tablename__ = "refresh_tokens"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id: Mapped[uuid.UUID] = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    family_id: Mapped[uuid.UUID] = Column(UUID(as_uuid=True), nullable=False, index=True)
+    token_hash: Mapped[str] = Column(String(64), unique=True, nullable=False, index=True)
+    expires_at: Mapped[datetime] = Column(DateTime(timezone=True), nullable=False)
+    created_at: Mapped[datetime] = Column(DateTime(timezone=True), server_default=func.now())
+    revoked_at: Mapped[datetime] = Column(DateTime(timezone=True), nullable=True)
+    replaced_by_id: Mapped[uuid.UUID] = Column(UUID(as_uuid=True), nullable=True)
+
+    def __repr__(self) -> str:
+        """Provides a readable representation of a refresh token without exposing its digest."""
+        return f"<RefreshToken {self.id}, User: {self.user_id}>"
@@ -0,0 +1,90 @@
+from builtins import bool, classmethod, getattr, setattr, str, zip
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import uuid
+from app.models.user_model import User, UserRole
+
+class UserProjection:
+    """
+    Base for slot-backed views over a subset of the `users` columns.
+
+    A subclass lists the columns it needs in `__slots__`; `columns()` selects exactly those, and
+    `from_row` fills a view from a result row. Views are plain objects, never in a session's
+    identity map, and cost a fraction of a `User` instance to build and keep.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def columns(cls) -> List:
+        return [getattr(User, field) for field in cls.__slots__]
+
+    @classmethod
+    def from_row(cls, row) -> "UserProjection":
+        view = cls.__new__(cls)
+        for field, value in zip(cls.__slots__, row):
+            setattr(view, field, value)
+        return view
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserProjection":
+        view = cls.__new__(cls)
+        for field in cls.__slots__:
+            setattr(view, field, getattr(user, field))
+        return view
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+class UserReadModel(UserProjection):
+    """
+    Detached snapshot of a user's public profile, safe to cache and share between requests.
+
+    It deliberately has no `hashed_password`, `verification_token` or login counters, so nothing
+    served from a cache can leak credentials into a response.
+    """
+    __slots__ = (
+        "id", "nickname", "email", "first_name", "last_name", "bio", "profile_picture_url",
+        "linkedin_profile_url", "github_profile_url", "role", "is_professional", "email_verified",
+        "is_locked", "last_login_at", "created_at", "updated_at",
+    )
+
+    id: uuid.UUID
+    nickname: str
+    email: str
+    first_name: Optional[str]
+    last_name: Optional[str]
+    bio: Optional[str]
+    profile_picture_url: Optional[str]
+    linkedin_profile_url: Optional[str]
+    github_profile_url: Optional[str]
+    role: UserRole
+    is_professional: Optional[bool]
+    email_verified: bool
+    is_locked: Optional[bool]
+    last_login_at: Optional[datetime]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+class UserSummary(UserProjection):
+    """
+    A listing row: the `UserResponse` fields plus `created_at`, which the page cursors are built from,
+    and `updated_at`, which the page's ETag is built from.
+    """
+    __slots__ = (
+        "id", "nickname", "email", "first_name", "last_name", "bio", "profile_picture_url",
+        "linkedin_profile_url", "github_profile_url", "role", "is_professional", "created_at", "updated_at",
+    )
+
+    id: uuid.UUID
+    nickname: str
+    email: str
+    first_name: Optional[str]
+    last_name: Optional[str]
+    bio: Optional[str]
+    profile_picture_url: Optional[str]
+    linkedin_profile_url: Optional[str]
+    github_profile_url: Optional[str]
+    role: UserRole
+    is_professional: Optional[bool]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
@@ -0,0 +1,28 @@
+"""
+Operational endpoints for administrators. They expose the in-process metrics of the worker that
+answers the request, so numbers from several workers have to be collected and added up by the caller.
+"""
+
+from builtins import dict
+from fastapi import APIRouter, Depends
+from app.database import Database
+from app.dependencies import require_role
+from app.utils.metrics import metrics
+
+router = APIRouter()
+
+@router.get("/admin/metrics", name="get_metrics", tags=["Administration Requires (Admin Role)"])
+async def get_metrics(current_user: dict = Depends(require_role(["ADMIN"]))):
+    """
+    Return the counters and gauges collected by this worker.
+    """
+    return {"metrics": metrics.snapshot()}
+
+@router.get("/admin/db/pool", name="get_db_pool_status", tags=["Administration Requires (Admin Role)"])
+async def get_db_pool_status(current_user: dict = Depends(require_role(["ADMIN"]))):
+    """
+    Report connection pool saturation: connections checked out, overflow in use, and how long
+    requests waited to acquire a connection. High wait times with a full pool point at the pool
+    rather than at Postgres as the source of latency.
+    """
+    return Database.pool_status()
@@ -18,26 +18,62 @@ Key Highlights:
 - Utilizes OAuth2PasswordBearer for securing API endpoints, requiring valid access tokens for operations.
 """
 
-from builtins import dict, int, len, str
+from builtins import dict, getattr, int, isinstance, len, list, str, tuple, zip
 from datetime import timedelta
+from typing import Optional, Tuple
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, Response, status, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.dependencies import get_current_user, get_db, get_email_service, require_role
+from app.database import Database, session_target
+from app.dependencies import get_current_user, get_db, get_email_service, get_read_db, limit_concurrency, mark_write, require_role
 from app.schemas.pagination_schema import EnhancedPagination
-from app.schemas.token_schema import TokenResponse
-from app.schemas.user_schemas import LoginRequest, UserBase, UserCreate, UserListResponse, UserResponse, UserUpdate
-from app.services.user_service import UserService
-from app.services.jwt_service import create_access_token
+from app.schemas.token_schema import RefreshTokenRequest, TokenResponse
+from app.schemas.user_schemas import CountMode, LoginRequest, PaginationMode, UserBase, UserBatchGetRequest, UserBatchGetResponse, UserCreate, UserListResponse, UserResponse, UserUpdate
+from app.services.refresh_token_service import RefreshTokenService
+from app.services.user_service import AccountLockedError, EmailAlreadyExistsError, PreconditionFailedError, UserService
+from app.services.jwt_service import create_user_access_token
+from app.utils.dataloader import DataLoader
 from app.utils.link_generation import create_user_links, generate_pagination_links
+from app.utils.etags import etag_matches, if_match_versions, list_etag, user_etag
+from app.utils.fast_json import FastJSONResponse
+from app.utils.fieldsets import InvalidFieldsError, parse_fields
+from app.utils.pagination import InvalidCursorError
+from app.utils.singleflight import SingleFlight
 from app.dependencies import get_settings
 from app.services.email_service import EmailService
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
+user_list_flights = SingleFlight("user_list")
+FIELDS_QUERY = Query(None, description="Comma-separated response fields to return, e.g. id,email,role; omitted fields are not read")
+
+def _parse_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    try:
+        return parse_fields(fields, UserResponse.model_fields)
+    except InvalidFieldsError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+async def get_user_loader(db: AsyncSession = Depends(get_read_db)) -> DataLoader:
+    """The request's loader, shared with `UserService.get_read_model`, that merges concurrent user lookups by id into one query."""
+    return UserService.loader(db)
 settings = get_settings()
+user_count_mode = CountMode(settings.user_count_mode)
+fast_json = settings.fast_json_responses
+USER_RESPONSE_FIELDS = tuple(UserResponse.model_fields)
+
+def _json_response(content, headers: Optional[dict] = None) -> Response:
+    """Send plain response data, bypassing the response model; encoded in one pass in fast JSON mode."""
+    if fast_json:
+        return FastJSONResponse(content=content, headers=headers)
+    return JSONResponse(content=jsonable_encoder(content), headers=headers)
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
 @router.get("/users/{user_id}", response_model=UserResponse, name="get_user", tags=["User Management Requires (Admin or Manager Roles)"])
-async def get_user(user_id: UUID, request: Request, db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
+async def get_user(user_id: UUID, request: Request, response: Response, fields: Optional[str] = FIELDS_QUERY, db: AsyncSession = Depends(get_read_db), token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
     """
     Endpoint to fetch a user by their unique identifier (UUID).
 
@@ -47,12 +83,34 @@ async def get_user(user_id: UUID, request: Request, db: AsyncSession = Depends(g
     Args:
         user_id: UUID of the user to fetch.
         request: The request object, used to generate full URLs in the response.
-        db: Dependency that provides an AsyncSession for database access.
+        fields: Optional comma-separated list of response fields; only those columns are read and returned.
+        db: Dependency that provides an AsyncSession for database access, served by a read replica when available.
         token: The OAuth2 access token obtained through OAuth2PasswordBearer dependency.
+
+    The response carries a weak ETag; a request whose If-None-Match still matches it is answered
+    304 after looking up only the user's version.
     """
-    user = await UserService.get_by_id(db, user_id)
+    selected = _parse_fields(fields)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        version = await UserService.get_version(db, user_id)
+        if version is not None and etag_matches(if_none_match, user_etag(user_id, version, selected)):
+            return _not_modified(user_etag(user_id, version, selected))
+
+    if selected is not None:
+        partial = await UserService.get_fields(db, user_id, (*selected, "updated_at"))
+        if partial is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+        version = partial.pop("updated_at")
+        return _json_response(partial, headers={"ETag": user_etag(user_id, version, selected)})
+
+    user = await UserService.get_read_model(db, user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    etag = user_etag(user.id, user.updated_at)
+    if fast_json:
+        return FastJSONResponse(content={field: getattr(user, field) for field in USER_RESPONSE_FIELDS}, headers={"ETag": etag})
+    response.headers["ETag"] = etag
 
     return UserResponse.model_construct(
         id=user.id,
@@ -78,18 +136,67 @@ async def get_user(user_id: UUID, request: Request, db: AsyncSession = Depends(g
 # This approach not only ensures that the API is secure and efficient but also promotes a better client
 # experience by adhering to REST principles and providing self-discoverable operations.
 
+@router.post("/users/batch-get", response_model=UserBatchGetResponse, name="batch_get_users", tags=["User Management Requires (Admin or Manager Roles)"])
+async def batch_get_users(batch: UserBatchGetRequest, request: Request, user_loader: DataLoader = Depends(get_user_loader), token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
+    """
+    Fetch up to `user_batch_get_max` users by id in one call, answered by a single query.
+
+    - **ids**: UUIDs of the users to fetch; duplicates are returned once.
+    """
+    user_ids = list(dict.fromkeys(batch.ids))
+    users = await user_loader.load_many(user_ids)
+    missing = [user_id for user_id, user in zip(user_ids, users) if user is None]
+    if fast_json:
+        return FastJSONResponse(content={
+            "items": [{field: getattr(user, field) for field in USER_RESPONSE_FIELDS} for user in users if user is not None],
+            "missing": missing,
+        })
+    return UserBatchGetResponse(
+        items=[
+            UserResponse.model_construct(
+                id=user.id,
+                nickname=user.nickname,
+                first_name=user.first_name,
+                last_name=user.last_name,
+                bio=user.bio,
+                profile_picture_url=user.profile_picture_url,
+                github_profile_url=user.github_profile_url,
+                linkedin_profile_url=user.linkedin_profile_url,
+                role=user.role,
+                email=user.email,
+                last_login_at=user.last_login_at,
+                created_at=user.created_at,
+                updated_at=user.updated_at,
+                links=create_user_links(user.id, request)
+            )
+            for user in users if user is not None
+        ],
+        missing=missing,
+    )
+
 @router.put("/users/{user_id}", response_model=UserResponse, name="update_user", tags=["User Management Requires (Admin or Manager Roles)"])
-async def update_user(user_id: UUID, user_update: UserUpdate, request: Request, db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
+async def update_user(user_id: UUID, user_update: UserUpdate, request: Request, response: Response, db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
     """
     Update user information.
 
     - **user_id**: UUID of the user to update.
     - **user_update**: UserUpdate model with updated user information.
+
+    Send the ETag from a previous read as If-Match to update only if nobody changed the user since;
+    otherwise the update is refused with 412.
     """
+    if_versions = if_match_versions(request.headers.get("if-match"), user_id)
+    if if_versions is not None and not if_versions:
+        raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail="User has been modified since it was read")
     user_data = user_update.model_dump(exclude_unset=True)
-    updated_user = await UserService.update(db, user_id, user_data)
+    try:
+        updated_user = await UserService.update(db, user_id, user_data, if_versions)
+    except PreconditionFailedError:
+        raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail="User has been modified since it was read")
     if not updated_user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    mark_write(response, current_user["user_id"])
+    response.headers["ETag"] = user_etag(updated_user.id, updated_user.updated_at)
 
     return UserResponse.model_construct(
         id=updated_user.id,
@@ -118,12 +225,14 @@ async def delete_user(user_id: UUID, db: AsyncSession = Depends(get_db), token:
     success = await UserService.delete(db, user_id)
     if not success:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-    return Response(status_code=status.HTTP_204_NO_CONTENT)
+    response = Response(status_code=status.HTTP_204_NO_CONTENT)
+    mark_write(response, current_user["user_id"])
+    return response
 
 
 
-@router.post("/users/", response_model=UserResponse, status_code=status.HTTP_201_CREATED, tags=["User Management Requires (Admin or Manager Roles)"], name="create_user")
-async def create_user(user: UserCreate, request: Request, db: AsyncSession = Depends(get_db), email_service: EmailService = Depends(get_email_service), token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
+@router.post("/users/", response_model=UserResponse, status_code=status.HTTP_201_CREATED, tags=["User Management Requires (Admin or Manager Roles)"], name="create_user", dependencies=[Depends(limit_concurrency("create_user"))])
+async def create_user(user: UserCreate, request: Request, response: Response, db: AsyncSession = Depends(get_db), email_service: EmailService = Depends(get_email_service), token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
     """
     Create a new user.
 
@@ -139,13 +248,13 @@ async def create_user(user: UserCreate, request: Request, db: AsyncSession = Dep
     Returns:
     - UserResponse: The newly created user's information along with navigation links.
     """
-    existing_user = await UserService.get_by_email(db, user.email)
-    if existing_user:
+    try:
+        created_user = await UserService.create(db, user.model_dump(), email_service)
+    except EmailAlreadyExistsError:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already exists")
-    
-    created_user = await UserService.create(db, user.model_dump(), email_service)
     if not created_user:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to create user")
+    mark_write(response, current_user["user_id"])
     
     
     return UserResponse.model_construct(
@@ -166,71 +275,177 @@ async def create_user(user: UserCreate, request: Request, db: AsyncSession = Dep
 @router.get("/users/", response_model=UserListResponse, tags=["User Management Requires (Admin or Manager Roles)"])
 async def list_users(
     request: Request,
-    skip: int = 0,
-    limit: int = 10,
-    db: AsyncSession = Depends(get_db),
+    response: Response,
+    skip: int = Query(0, ge=0, description="Offset of the first user (offset pagination)"),
+    limit: int = Query(10, ge=1),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next/prev link; implies mode=cursor"),
+    mode: PaginationMode = Query(PaginationMode.OFFSET, description="offset (the default) or cursor (keyset) pagination"),
+    fields: Optional[str] = FIELDS_QUERY,
+    db: AsyncSession = Depends(get_read_db),
     current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))
 ):
-    total_users = await UserService.count(db)
-    users = await UserService.list_users(db, skip, limit)
+    """
+    List users ordered by creation time. Pages are offset (`skip`) paginated by default; `mode=cursor`
+    or a `cursor` switches to keyset pagination, which stays fast on deep pages.
+    The `user_count_mode` setting picks how `total` is computed. `fields` narrows each item to the
+    listed fields. Identical requests that arrive while one is being served share its response.
+    Pages carry a weak ETag; If-None-Match is checked against the page's row versions alone.
+    """
+    selected = _parse_fields(fields)
+    # Keyset pages are told apart by having no offset
+    if cursor is not None or mode == PaginationMode.CURSOR:
+        skip = None
+    key = ("list_users", str(request.url.replace(query="")), skip, limit, cursor, selected)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        etag = _user_page_etag(key, *await _fetch_user_page(db, skip, limit, cursor, ()))
+        if etag_matches(if_none_match, etag):
+            return _not_modified(etag)
+
+    page, etag = _build_user_list(request, key, skip, limit, cursor, selected, await _fetch_shared_user_page(db, key, skip, limit, cursor, selected))
+    # Sparse and fast pages are plain dicts; sparse ones would fail validation against the full item schema
+    if isinstance(page, dict):
+        return _json_response(page, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return page
+
+
+def _user_page_etag(key: tuple, total_users: Optional[int], users: list, next_cursor: Optional[str], prev_cursor: Optional[str], has_more: bool) -> str:
+    return list_etag(key, total_users, has_more, next_cursor, prev_cursor, [(user.id, user.updated_at) for user in users])
+
+
+async def _fetch_user_page(db: AsyncSession, skip: Optional[int], limit: int, cursor: Optional[str], selected: Optional[Tuple[str, ...]]):
+    """The total (per the count mode), the page's rows, its cursors and whether more follow."""
+    if user_count_mode == CountMode.EXACT:
+        total_users = await UserService.count(db)
+    elif user_count_mode == CountMode.ESTIMATED:
+        total_users = await UserService.estimated_count(db)
+    else:
+        total_users = None
+
+    next_cursor = prev_cursor = None
+    if skip is None:
+        try:
+            users, next_cursor, prev_cursor = await UserService.list_users_by_cursor(db, limit, cursor, selected)
+        except InvalidCursorError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor")
+        has_more = next_cursor is not None
+    else:
+        # Fetch one extra row to learn whether another page follows
+        users = await UserService.list_users(db, skip, limit + 1, selected)
+        has_more = len(users) > limit
+        users = users[:limit]
+    return total_users, users, next_cursor, prev_cursor, has_more
+
+
+async def _fetch_shared_user_page(db: AsyncSession, key: tuple, skip: Optional[int], limit: int, cursor: Optional[str], selected: Optional[Tuple[str, ...]]):
+    """
+    `_fetch_user_page`, run once for identical concurrent requests. The shared fetch reads on a session
+    of its own, against the same database as `db`, so a client stuck to the primary is never handed
+    a page read from a replica, and a caller that goes away doesn't take the others' page with it.
+    """
+    session_factory = Database.session_factory_for(db)
+
+    async def fetch():
+        async with session_factory() as session:
+            return await _fetch_user_page(session, skip, limit, cursor, selected)
+    return await user_list_flights.do((session_target(db),) + key, fetch)
+
+
+def _build_user_list(request: Request, key: tuple, skip: Optional[int], limit: int, cursor: Optional[str], selected: Optional[Tuple[str, ...]], fetched: tuple):
+    """The page response for this request, with links built from its own URL."""
+    total_users, users, next_cursor, prev_cursor, has_more = fetched
+    etag = _user_page_etag(key, total_users, users, next_cursor, prev_cursor, has_more)
+
+    # Rows come straight from the database, so they are trusted rather than re-validated
+    plain = selected is not None or fast_json
+    if not plain:
+        user_responses = [
+            UserResponse.model_construct(**user.as_dict()) for user in users
+        ]
+    else:
+        user_responses = []
+
+    pagination_links = generate_pagination_links(
+        request, skip, limit, total_users, cursor, next_cursor, prev_cursor, has_more,
+        fields=",".join(selected) if selected is not None else None
+    )
 
-    user_responses = [
-        UserResponse.model_validate(user) for user in users
-    ]
-    
-    pagination_links = generate_pagination_links(request, skip, limit, total_users)
-    
     # Construct the final response with pagination details
-    return UserListResponse(
+    page = UserListResponse(
         items=user_responses,
         total=total_users,
-        page=skip // limit + 1,
-        size=len(user_responses),
-        links=pagination_links  # Ensure you have appropriate logic to create these links
+        total_mode=user_count_mode,
+        has_more=has_more,
+        page=skip // limit + 1 if skip is not None else None,
+        size=len(users),
+        next_cursor=next_cursor,
+        prev_cursor=prev_cursor,
+        links=pagination_links
     )
+    if not plain:
+        return page, etag
+    item_fields = selected or USER_RESPONSE_FIELDS
+    content = page.model_dump(mode="json")
+    content["items"] = [{field: getattr(user, field) for field in item_fields} for user in users]
+    return content, etag
 
 
-@router.post("/register/", response_model=UserResponse, tags=["Login and Registration"])
+@router.post("/register/", response_model=UserResponse, tags=["Login and Registration"], dependencies=[Depends(limit_concurrency("register"))])
 async def register(user_data: UserCreate, session: AsyncSession = Depends(get_db), email_service: EmailService = Depends(get_email_service)):
-    user = await UserService.register_user(session, user_data.model_dump(), email_service)
+    try:
+        user = await UserService.register_user(session, user_data.model_dump(), email_service)
+    except EmailAlreadyExistsError:
+        raise HTTPException(status_code=400, detail="Email already exists")
     if user:
         return user
-    raise HTTPException(status_code=400, detail="Email already exists")
+    raise HTTPException(status_code=400, detail="Failed to register user")
 
-@router.post("/login/", response_model=TokenResponse, tags=["Login and Registration"])
+@router.post("/login/", response_model=TokenResponse, tags=["Login and Registration"], dependencies=[Depends(limit_concurrency("login"))])
 async def login(form_data: OAuth2PasswordRequestForm = Depends(), session: AsyncSession = Depends(get_db)):
-    if await UserService.is_account_locked(session, form_data.username):
+    try:
+        user = await UserService.login_user(session, form_data.username, form_data.password)
+    except AccountLockedError:
         raise HTTPException(status_code=400, detail="Account locked due to too many failed login attempts.")
-
-    user = await UserService.login_user(session, form_data.username, form_data.password)
     if user:
         access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
 
-        access_token = create_access_token(
-            data={"sub": user.email, "role": str(user.role.name)},
-            expires_delta=access_token_expires
-        )
+        access_token = create_user_access_token(user, expires_delta=access_token_expires)
+        refresh_token = await RefreshTokenService.create_for_user(session, user.id)
 
-        return {"access_token": access_token, "token_type": "bearer"}
+        return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
     raise HTTPException(status_code=401, detail="Incorrect email or password.")
 
-@router.post("/login/", include_in_schema=False, response_model=TokenResponse, tags=["Login and Registration"])
+@router.post("/login/", include_in_schema=False, response_model=TokenResponse, tags=["Login and Registration"], dependencies=[Depends(limit_concurrency("login"))])
 async def login(form_data: OAuth2PasswordRequestForm = Depends(), session: AsyncSession = Depends(get_db)):
-    if await UserService.is_account_locked(session, form_data.username):
+    try:
+        user = await UserService.login_user(session, form_data.username, form_data.password)
+    except AccountLockedError:
         raise HTTPException(status_code=400, detail="Account locked due to too many failed login attempts.")
-
-    user = await UserService.login_user(session, form_data.username, form_data.password)
     if user:
         access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
 
-        access_token = create_access_token(
-            data={"sub": user.email, "role": str(user.role.name)},
-            expires_delta=access_token_expires
-        )
+        access_token = create_user_access_token(user, expires_delta=access_token_expires)
+        refresh_token = await RefreshTokenService.create_for_user(session, user.id)
 
-        return {"access_token": access_token, "token_type": "bearer"}
+        return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
     raise HTTPException(status_code=401, detail="Incorrect email or password.")
 
+@router.post("/token/refresh", response_model=TokenResponse, name="refresh_token", tags=["Login and Registration"])
+async def refresh_access_token(refresh_request: RefreshTokenRequest, session: AsyncSession = Depends(get_db)):
+    """
+    Exchange a refresh token for a new access token without re-entering the password.
+
+    The presented refresh token is rotated: the response carries a replacement and the old token stops
+    working. Presenting a token that was already rotated revokes every token descended from the same login.
+    """
+    rotated = await RefreshTokenService.rotate(session, refresh_request.refresh_token)
+    if not rotated:
+        raise HTTPException(status_code=401, detail="Invalid or expired refresh token.", headers={"WWW-Authenticate": "Bearer"})
+    user, refresh_token = rotated
+    access_token = create_user_access_token(user, expires_delta=timedelta(minutes=settings.access_token_expire_minutes))
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
 
 @router.get("/verify-email/{user_id}/{token}", status_code=status.HTTP_200_OK, name="verify_email", tags=["Login and Registration"])
 async def verify_email(user_id: UUID, token: str, db: AsyncSession = Depends(get_db), email_service: EmailService = Depends(get_email_service)):
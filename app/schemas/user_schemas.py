@@ -6,7 +6,9 @@ from enum import Enum
 import uuid
 import re
 
+from app.schemas.pagination_schema import PaginationLink
 from app.utils.nickname_gen import generate_nickname
+from settings.config import settings
 
 class UserRole(str, Enum):
     ANONYMOUS = "ANONYMOUS"
@@ -14,6 +16,15 @@ class UserRole(str, Enum):
     MANAGER = "MANAGER"
     ADMIN = "ADMIN"
 
+class CountMode(str, Enum):
+    EXACT = "exact"
+    ESTIMATED = "estimated"
+    NONE = "none"
+
+class PaginationMode(str, Enum):
+    OFFSET = "offset"
+    CURSOR = "cursor"
+
 def validate_url(url: Optional[str]) -> Optional[str]:
     if url is None:
         return url
@@ -116,6 +127,18 @@ class UserListResponse(BaseModel):
         "linkedin_profile_url": "https://linkedin.com/in/johndoe", 
         "github_profile_url": "https://github.com/johndoe"
     }])
-    total: int = Field(..., example=100)
-    page: int = Field(..., example=1)
+    total: Optional[int] = Field(..., example=100, description="Number of users; null when the count mode is 'none'")
+    total_mode: CountMode = Field(CountMode.EXACT, description="How `total` was produced: an exact count, the planner's estimate, or not at all")
+    has_more: bool = Field(False, description="Whether another page follows this one")
+    page: Optional[int] = Field(None, example=1, description="Page number in offset mode; not set for cursor pages")
     size: int = Field(..., example=10)
+    next_cursor: Optional[str] = Field(None, description="Cursor of the next page in cursor mode")
+    prev_cursor: Optional[str] = Field(None, description="Cursor of the previous page in cursor mode")
+    links: List[PaginationLink] = []
+
+class UserBatchGetRequest(BaseModel):
+    ids: List[uuid.UUID] = Field(..., min_length=1, max_length=settings.user_batch_get_max, example=[uuid.uuid4(), uuid.uuid4()])
+
+class UserBatchGetResponse(BaseModel):
+    items: List[UserResponse] = Field(..., description="The users found, in the order requested")
+    missing: List[uuid.UUID] = Field([], description="Requested ids that match no user")
@@ -1,8 +1,15 @@
 # app/services/jwt_service.py
 from builtins import dict, str
+import hashlib
+import secrets
+import time
 import jwt
 from datetime import datetime, timedelta
 from settings.config import settings
+from app.utils.cache import TTLCache
+
+# Claims of tokens that already passed signature and claim validation, keyed by token digest.
+verified_token_cache = TTLCache("verified_tokens", max_size=settings.token_cache_size)
 
 def create_access_token(*, data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
@@ -14,9 +21,38 @@ def create_access_token(*, data: dict, expires_delta: timedelta = None):
     encoded_jwt = jwt.encode(to_encode, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
     return encoded_jwt
 
+def create_user_access_token(user, expires_delta: timedelta = None):
+    """Create an access token for a user, carrying the id and token version used for revocation checks."""
+    return create_access_token(
+        data={"sub": user.email, "role": str(user.role.name), "uid": str(user.id), "token_version": user.token_version or 0},
+        expires_delta=expires_delta
+    )
+
 def decode_token(token: str):
     try:
         decoded = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
         return decoded
     except jwt.PyJWTError:
         return None
+
+def decode_token_cached(token: str):
+    """
+    Same result as `decode_token`, but remembers the claims of valid tokens until their `exp`.
+    Rejected tokens are never cached, so they are re-checked on every request.
+    """
+    key = hashlib.sha256(token.encode('utf-8')).digest()
+    claims = verified_token_cache.get(key)
+    if claims is not None:
+        return claims
+    claims = decode_token(token)
+    if claims is not None and "exp" in claims:
+        verified_token_cache.set(key, claims, ttl=claims["exp"] - time.time())
+    return claims
+
+def create_refresh_token() -> str:
+    """Return a new opaque refresh token. Only its digest is ever stored server-side."""
+    return secrets.token_urlsafe(32)
+
+def hash_refresh_token(token: str) -> str:
+    """Return the SHA-256 hex digest under which a refresh token is stored and looked up."""
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
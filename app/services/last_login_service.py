@@ -0,0 +1,122 @@
+from builtins import Exception, bool, classmethod, dict, float, int, len, list, max, sorted
+import asyncio
+from datetime import datetime
+from typing import Dict, Optional
+from uuid import UUID
+from sqlalchemy import DateTime, column, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from app.database import Database
+from app.models.user_model import User
+from app.utils.metrics import metrics
+import logging
+
+logger = logging.getLogger(__name__)
+
+class LastLoginService:
+    """
+    Write-behind buffer for `users.last_login_at`.
+
+    Successful logins record their timestamp here instead of updating the row. Timestamps are
+    coalesced per user and written by one `UPDATE ... FROM (VALUES ...)` every `flush_interval`
+    seconds, as soon as `flush_size` users are pending, and once more when the app shuts down.
+    A failed flush puts its entries back so the next flush retries them, keeping at most `max_pending`
+    users: during a long outage the oldest timestamps are dropped (counted as `last_login.dropped`).
+    A crash loses at most one interval of last-login times, which are informational only.
+    """
+    flush_interval: float = 5.0
+    flush_size: int = 500
+    max_pending: int = 10000
+    _pending: Dict[UUID, datetime] = {}
+    _flusher: Optional[asyncio.Task] = None
+    _early_flush: Optional[asyncio.Task] = None
+    _flush_lock: Optional[asyncio.Lock] = None
+
+    @classmethod
+    def configure(cls, flush_interval: float, flush_size: int, max_pending: int = 10000):
+        cls.flush_interval = flush_interval
+        cls.flush_size = flush_size
+        cls.max_pending = max_pending
+
+    @classmethod
+    def record(cls, user_id: UUID, logged_in_at: datetime):
+        """Buffer a login, keeping only the newest timestamp per user."""
+        current = cls._pending.get(user_id)
+        cls._pending[user_id] = logged_in_at if current is None else max(current, logged_in_at)
+        metrics.increment("last_login.recorded")
+        if len(cls._pending) >= cls.flush_size and cls.is_running():
+            if cls._early_flush is None or cls._early_flush.done():
+                cls._early_flush = asyncio.ensure_future(cls.flush())
+
+    @classmethod
+    def is_running(cls) -> bool:
+        return cls._flusher is not None
+
+    @classmethod
+    def pending(cls) -> int:
+        return len(cls._pending)
+
+    @classmethod
+    async def flush(cls) -> int:
+        """Write every buffered timestamp in one statement. Returns the number of users written."""
+        if cls._flush_lock is None:
+            cls._flush_lock = asyncio.Lock()
+        async with cls._flush_lock:
+            if not cls._pending:
+                return 0
+            batch, cls._pending = cls._pending, {}
+            logins = values(
+                column("id", PG_UUID(as_uuid=True)), column("logged_in_at", DateTime(timezone=True)), name="logins"
+            ).data(list(batch.items()))
+            query = (
+                update(User)
+                .where(User.id == logins.c.id)
+                .where((User.last_login_at.is_(None)) | (User.last_login_at < logins.c.logged_in_at))
+                # Pinned: a login isn't an edit, so the user's ETag stays valid
+                .values(last_login_at=logins.c.logged_in_at, updated_at=User.updated_at)
+                .execution_options(synchronize_session=False)
+            )
+            try:
+                async with Database.get_session_factory()() as session:
+                    await session.execute(query)
+                    await session.commit()
+            except Exception as e:
+                logger.error(f"Failed to flush {len(batch)} last-login timestamps: {e}")
+                for user_id, logged_in_at in cls._pending.items():
+                    current = batch.get(user_id)
+                    batch[user_id] = logged_in_at if current is None else max(current, logged_in_at)
+                dropped = len(batch) - cls.max_pending
+                if dropped > 0:
+                    batch = dict(sorted(batch.items(), key=lambda item: item[1])[dropped:])
+                    logger.warning(f"Dropped the {dropped} oldest last-login timestamps while flushes are failing")
+                    metrics.increment("last_login.dropped", dropped)
+                cls._pending = batch
+                metrics.increment("last_login.flush_failures")
+                return 0
+            metrics.increment("last_login.flushed", len(batch))
+            return len(batch)
+
+    @classmethod
+    async def _flush_periodically(cls):
+        while True:
+            await asyncio.sleep(cls.flush_interval)
+            await cls.flush()
+
+    @classmethod
+    def start(cls):
+        """Start the periodic flusher on the running event loop."""
+        if cls._flusher is None:
+            cls._flush_lock = asyncio.Lock()
+            cls._flusher = asyncio.ensure_future(cls._flush_periodically())
+            metrics.register_gauge("last_login.pending", cls.pending)
+
+    @classmethod
+    async def stop(cls):
+        """Stop the periodic flusher and drain whatever is still buffered."""
+        if cls._flusher is not None:
+            cls._flusher.cancel()
+            try:
+                await cls._flusher
+            except asyncio.CancelledError:
+                pass
+            cls._flusher = None
+        await cls.flush()
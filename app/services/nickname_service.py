@@ -0,0 +1,48 @@
+from builtins import classmethod, float, int, len, set, str
+from typing import Optional
+from sqlalchemy import any_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.user_model import User
+from app.utils.metrics import metrics
+from app.utils.nickname_gen import generate_nicknames
+import logging
+
+logger = logging.getLogger(__name__)
+
+def _collision_rate() -> float:
+    generated = metrics.get("nicknames.generated")
+    return metrics.get("nicknames.collisions") / generated if generated else 0.0
+
+metrics.register_gauge("nicknames.collision_rate", _collision_rate)
+
+class NicknameService:
+    """
+    Allocates free nicknames for new users.
+
+    Every generated nickname that reaches the database is counted in `nicknames.generated` and every
+    one found taken in `nicknames.collisions`; `nicknames.collision_rate` is their ratio, an early
+    warning that the word space is filling up.
+    """
+    batch_size = 16
+
+    @classmethod
+    def record(cls, generated: int, collisions: int):
+        metrics.increment("nicknames.generated", generated)
+        if collisions:
+            metrics.increment("nicknames.collisions", collisions)
+
+    @classmethod
+    async def allocate(cls, session: AsyncSession, batch_size: Optional[int] = None) -> Optional[str]:
+        """
+        Return a nickname that no user has yet, checking a whole batch of candidates with one
+        `nickname = ANY(...)` query. Returns None if every candidate of the batch is taken.
+        """
+        candidates = generate_nicknames(batch_size or cls.batch_size)
+        result = await session.execute(select(User.nickname).where(User.nickname == any_(candidates)))
+        taken = set(result.scalars().all())
+        cls.record(len(candidates), len(taken))
+        for nickname in candidates:
+            if nickname not in taken:
+                return nickname
+        logger.warning(f"All {len(candidates)} nickname candidates were taken.")
+        return None
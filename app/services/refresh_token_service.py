@@ -0,0 +1,82 @@
+from builtins import classmethod, str
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+import uuid
+from uuid import UUID
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import commit_write, rollback_write
+from app.dependencies import get_settings
+from app.models.refresh_token_model import RefreshToken
+from app.models.user_model import User
+from app.services.jwt_service import create_refresh_token, hash_refresh_token
+import logging
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+class RefreshTokenService:
+    @classmethod
+    async def issue(cls, session: AsyncSession, user_id: UUID, family_id: Optional[UUID] = None) -> Tuple[str, RefreshToken]:
+        """Create and stage a refresh token for a user, starting a new family unless one is given."""
+        token = create_refresh_token()
+        record = RefreshToken(
+            id=uuid.uuid4(),
+            user_id=user_id,
+            family_id=family_id or uuid.uuid4(),
+            token_hash=hash_refresh_token(token),
+            expires_at=datetime.now(timezone.utc) + timedelta(minutes=settings.refresh_token_expire_minutes),
+        )
+        session.add(record)
+        return token, record
+
+    @classmethod
+    async def create_for_user(cls, session: AsyncSession, user_id: UUID) -> str:
+        """Issue the first refresh token of a new family and stage it for commit."""
+        token, _ = await cls.issue(session, user_id)
+        await commit_write(session)
+        return token
+
+    @classmethod
+    async def rotate(cls, session: AsyncSession, token: str) -> Optional[Tuple[User, str]]:
+        """
+        Exchange a refresh token for a new one in the same family.
+
+        The presented token is locked while it is checked and then revoked. Presenting a token that was
+        already revoked is treated as theft: the whole family is revoked and None is returned.
+        """
+        now = datetime.now(timezone.utc)
+        query = select(RefreshToken).where(RefreshToken.token_hash == hash_refresh_token(token)).with_for_update()
+        record = (await session.execute(query)).scalars().first()
+        if record is None:
+            return None
+        if record.revoked_at is not None:
+            logger.warning(f"Refresh token reuse detected for user {record.user_id}; revoking family {record.family_id}.")
+            await cls._revoke(session, RefreshToken.family_id == record.family_id, now)
+            await commit_write(session)
+            return None
+        if record.expires_at <= now:
+            await rollback_write(session)
+            return None
+
+        user = await session.get(User, record.user_id)
+        if user is None or user.is_locked:
+            await cls._revoke(session, RefreshToken.family_id == record.family_id, now)
+            await commit_write(session)
+            return None
+
+        new_token, new_record = await cls.issue(session, record.user_id, record.family_id)
+        record.revoked_at = now
+        record.replaced_by_id = new_record.id
+        await commit_write(session)
+        return user, new_token
+
+    @classmethod
+    async def revoke_all_for_user(cls, session: AsyncSession, user_id: UUID):
+        """Revoke every outstanding refresh token of a user. The caller commits."""
+        await cls._revoke(session, RefreshToken.user_id == user_id, datetime.now(timezone.utc))
+
+    @classmethod
+    async def _revoke(cls, session: AsyncSession, condition, now: datetime):
+        query = update(RefreshToken).where(condition, RefreshToken.revoked_at.is_(None)).values(revoked_at=now)
+        await session.execute(query)
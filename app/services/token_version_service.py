@@ -0,0 +1,38 @@
+from builtins import classmethod, int
+from typing import Optional
+from uuid import UUID
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.user_model import User
+from app.utils.cache import TTLCache
+from settings.config import settings
+
+# Versions of users that no longer exist are cached as this value, which no token carries.
+_DELETED = -1
+
+class TokenVersionService:
+    """
+    Resolves the current `token_version` of a user for access-token revocation checks.
+
+    Versions are cached per user id for `token_version_cache_ttl_seconds`, so the check costs a SELECT
+    only on a cache miss. Writers that bump a version call `invalidate` after committing and publish
+    the bump on the invalidation bus, which evicts the entry on the other workers as well. The TTL
+    only bounds how long a revoked token can still pass on a worker that missed the message while
+    its bus connection was down.
+    """
+    cache = TTLCache("token_versions", max_size=settings.token_version_cache_size, ttl=settings.token_version_cache_ttl_seconds)
+
+    @classmethod
+    async def get_version(cls, session: AsyncSession, user_id: UUID) -> Optional[int]:
+        """Return the user's current token version, or None if the user no longer exists."""
+        version = cls.cache.get(user_id)
+        if version is None:
+            result = await session.execute(select(User.token_version).where(User.id == user_id))
+            version = result.scalar_one_or_none()
+            cls.cache.set(user_id, _DELETED if version is None else version)
+        return None if version == _DELETED else version
+
+    @classmethod
+    def invalidate(cls, user_id: UUID):
+        """Forget the cached version of a user so the next check reads it from the database."""
+        cls.cache.delete(user_id)
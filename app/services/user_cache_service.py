@@ -0,0 +1,102 @@
+from builtins import bool, classmethod, getattr, int, str
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+from app.models.user_read_model import UserReadModel
+from app.utils.cache import TTLCache
+from app.utils.metrics import metrics
+from settings.config import settings
+
+class UserCacheService:
+    """
+    Per-worker cache of user read models, addressable by id, email or nickname.
+
+    Models are stored under ("id", id); emails and nicknames map to the id, and a lookup only hits
+    when the model found still carries that email or nickname, so a renamed user can't be served
+    under an old key. Writers replace or drop entries after they commit and publish the change on the
+    invalidation bus, which drops the entry on the other workers too; `user_cache_ttl_seconds` only
+    bounds staleness when a bus message is lost.
+
+    Every write-side change bumps a generation. A reader takes it before loading a model and stores
+    the result with `put_loaded`, which refuses it if anything changed meanwhile, so a load that
+    raced a write can't put an older copy back.
+    """
+    cache = TTLCache("users", max_size=settings.user_cache_size, ttl=settings.user_cache_ttl_seconds)
+    _generation = 0
+    metrics.register_gauge("cache.users.hit_ratio", lambda: UserCacheService.cache.hit_ratio())
+
+    @classmethod
+    def get_by_id(cls, user_id: UUID) -> Optional[UserReadModel]:
+        return cls.cache.get(("id", user_id))
+
+    @classmethod
+    def get_by_email(cls, email: str) -> Optional[UserReadModel]:
+        return cls._get_by_alias("email", email)
+
+    @classmethod
+    def get_by_nickname(cls, nickname: str) -> Optional[UserReadModel]:
+        return cls._get_by_alias("nickname", nickname)
+
+    @classmethod
+    def _get_by_alias(cls, field: str, value: str) -> Optional[UserReadModel]:
+        user_id = cls.cache.get((field, value))
+        if user_id is None:
+            return None
+        model = cls.cache.get(("id", user_id))
+        if model is None or getattr(model, field) != value:
+            return None
+        return model
+
+    @classmethod
+    def generation(cls) -> int:
+        return cls._generation
+
+    @classmethod
+    def put(cls, model: UserReadModel):
+        """Store the model a writer just committed."""
+        cls._generation += 1
+        cls._store(model)
+
+    @classmethod
+    def put_loaded(cls, model: UserReadModel, generation: int) -> bool:
+        """
+        Store a model a reader loaded, unless a writer changed the cache since `generation` was taken
+        or the cached copy is newer. Returns whether it was stored.
+        """
+        if generation != cls._generation:
+            return False
+        cached = cls.cache.get(("id", model.id))
+        if cached is not None and cached.updated_at is not None and (
+            model.updated_at is None or cached.updated_at > model.updated_at
+        ):
+            return False
+        cls._store(model)
+        return True
+
+    @classmethod
+    def _store(cls, model: UserReadModel):
+        cls.cache.set(("id", model.id), model)
+        cls.cache.set(("email", model.email), model.id)
+        cls.cache.set(("nickname", model.nickname), model.id)
+
+    @classmethod
+    def record_login(cls, user_id: UUID, logged_in_at: datetime):
+        """Move the cached copy's last login forward without dropping the entry."""
+        model = cls.cache.get(("id", user_id))
+        if model is not None:
+            model.last_login_at = logged_in_at
+
+    @classmethod
+    def invalidate(cls, user_id: UUID):
+        """Drop a user, and the email and nickname keys of the cached copy."""
+        cls._generation += 1
+        model = cls.cache.get(("id", user_id))
+        cls.cache.delete(("id", user_id))
+        if model is not None:
+            cls.cache.delete(("email", model.email))
+            cls.cache.delete(("nickname", model.nickname))
+
+    @classmethod
+    def clear(cls):
+        cls._generation += 1
+        cls.cache.clear()
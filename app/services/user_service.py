@@ -1,40 +1,121 @@
-from builtins import Exception, bool, classmethod, int, str
+from builtins import Exception, ValueError, bool, classmethod, dict, getattr, int, len, list, range, str
+import asyncio
 from datetime import datetime, timezone
 import secrets
-from typing import Optional, Dict, List
+from typing import Any, Optional, Dict, List, Sequence, Set, Tuple
 from pydantic import ValidationError
-from sqlalchemy import func, update, select
+from sqlalchemy import and_, any_, case, delete, func, or_, text, update, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+from app.database import Database, after_commit, commit_write, rollback_write, session_target
 from app.dependencies import get_email_service, get_settings
 from app.models.user_model import User
+from app.models.user_read_model import UserReadModel, UserSummary
 from app.schemas.user_schemas import UserCreate, UserUpdate
+from app.utils.cache import TTLCache
+from app.utils.dataloader import DataLoader
+from app.utils.invalidation_bus import invalidation_bus
 from app.utils.nickname_gen import generate_nickname
-from app.utils.security import generate_verification_token, hash_password, verify_password
+from app.utils.pagination import NEXT, PREV, decode_cursor, encode_cursor
+from app.utils.singleflight import SingleFlight
+from app.utils.security import HashingQueueFullError, generate_verification_token, hash_password_async, needs_rehash, verify_password_async
 from uuid import UUID
 from app.services.email_service import EmailService
+from app.services.last_login_service import LastLoginService
+from app.services.nickname_service import NicknameService
+from app.services.refresh_token_service import RefreshTokenService
+from app.services.user_cache_service import UserCacheService
+from app.services.token_version_service import TokenVersionService
 from app.models.user_model import UserRole
 import logging
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+# Inserts tried before giving up on finding a free nickname
+NICKNAME_ATTEMPTS = 5
+
+class EmailAlreadyExistsError(ValueError):
+    """Raised when a user is created with an email that is already registered."""
+
+class AccountLockedError(Exception):
+    """Raised when a login is attempted on a locked account."""
+
+class PreconditionFailedError(Exception):
+    """Raised when a conditional update finds the user at a version other than the ones it expected."""
+
+# Fields whose change revokes the access tokens already issued to a user.
+REVOKING_FIELDS = frozenset({'email', 'role', 'hashed_password', 'is_locked'})
+
+# Strong references to fire-and-forget tasks so they aren't garbage collected mid-flight.
+_background_tasks: Set[asyncio.Task] = set()
+
+def _run_in_background(coro):
+    task = asyncio.ensure_future(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+def _evict_user(key: str, version: Optional[int]):
+    user_id = UUID(key)
+    TokenVersionService.invalidate(user_id)
+    UserCacheService.invalidate(user_id)
+
+def _clear_user_caches():
+    TokenVersionService.cache.clear()
+    UserCacheService.clear()
+    UserService.invalidate_count()
+
 class UserService:
+    # Exact user count, dropped whenever a user is created or deleted
+    count_cache = TTLCache("user_count", max_size=1, ttl=settings.user_count_cache_ttl_seconds)
+    # Identical concurrent reads share one query; only calls that return detached values go through it
+    reads = SingleFlight("users")
+
+    @classmethod
+    async def _execute_read(cls, session: AsyncSession, query):
+        """Run a read-only statement. Reads never commit; the transaction ends with the request."""
+        try:
+            return await session.execute(query)
+        except SQLAlchemyError as e:
+            logger.error(f"Database error: {e}")
+            await rollback_write(session)
+            raise e
+
     @classmethod
-    async def _execute_query(cls, session: AsyncSession, query):
+    async def _execute_write(cls, session: AsyncSession, query):
+        """Run a data-modifying statement and hand it to the unit of work (or commit it outside of one)."""
         try:
             result = await session.execute(query)
-            await session.commit()
+            await commit_write(session)
             return result
         except SQLAlchemyError as e:
             logger.error(f"Database error: {e}")
-            await session.rollback()
+            await rollback_write(session)
             raise e
 
+    @classmethod
+    async def _shared_read(cls, session: AsyncSession, key: tuple, load):
+        """
+        Run `load(session)` once for identical concurrent reads against the same database. The shared
+        load gets a session of its own, so it doesn't depend on the request that started it staying
+        around. A session with uncommitted writes reads on its own, since only its transaction can see them.
+        """
+        if session.info.get("has_writes"):
+            return await load(session)
+        session_factory = Database.session_factory_for(session)
+
+        async def run():
+            async with session_factory() as shared_session:
+                return await load(shared_session)
+        return await cls.reads.do((session_target(session),) + key, run)
+
     @classmethod
     async def _fetch_user(cls, session: AsyncSession, **filters) -> Optional[User]:
         query = select(User).filter_by(**filters)
-        result = await cls._execute_query(session, query)
+        result = await cls._execute_read(session, query)
         return result.scalars().first() if result else None
 
     @classmethod
@@ -49,36 +130,169 @@ class UserService:
     async def get_by_email(cls, session: AsyncSession, email: str) -> Optional[User]:
         return await cls._fetch_user(session, email=email)
 
+    @classmethod
+    async def get_read_model(cls, session: AsyncSession, user_id: UUID) -> Optional[UserReadModel]:
+        """The user's public profile, from the read cache when possible. Never carries credentials."""
+        model = UserCacheService.get_by_id(user_id)
+        if model is None:
+            if session.info.get("has_writes"):
+                # The loader may hold what this request read before its own writes
+                return await cls._load_read_model(session, id=user_id)
+            model = await cls.loader(session).load(user_id)
+        return model
+
+    @classmethod
+    async def get_version(cls, session: AsyncSession, user_id: UUID) -> Optional[datetime]:
+        """The user's `updated_at`, from the read cache or a single-column lookup; None if there is no such user."""
+        model = UserCacheService.get_by_id(user_id)
+        if model is not None:
+            return model.updated_at
+        result = await cls._execute_read(session, select(User.updated_at).where(User.id == user_id))
+        return result.scalar_one_or_none() if result else None
+
+    @classmethod
+    async def get_fields(cls, session: AsyncSession, user_id: UUID, fields: Sequence[str]) -> Optional[Dict[str, Any]]:
+        """Only the given profile fields of a user, from the read cache or a SELECT of just those columns."""
+        model = UserCacheService.get_by_id(user_id)
+        if model is not None:
+            return {field: getattr(model, field) for field in fields}
+        result = await cls._execute_read(session, select(*(getattr(User, field) for field in fields)).where(User.id == user_id))
+        row = result.first() if result else None
+        return dict(row._mapping) if row is not None else None
+
+    @classmethod
+    async def get_read_model_by_email(cls, session: AsyncSession, email: str) -> Optional[UserReadModel]:
+        model = UserCacheService.get_by_email(email)
+        if model is None:
+            model = await cls._shared_read(
+                session, ("get_read_model_by_email", email), lambda shared: cls._load_read_model(shared, email=email)
+            )
+        return model
+
+    @classmethod
+    async def get_read_model_by_nickname(cls, session: AsyncSession, nickname: str) -> Optional[UserReadModel]:
+        model = UserCacheService.get_by_nickname(nickname)
+        if model is None:
+            model = await cls._shared_read(
+                session, ("get_read_model_by_nickname", nickname), lambda shared: cls._load_read_model(shared, nickname=nickname)
+            )
+        return model
+
+    @classmethod
+    async def _load_read_model(cls, session: AsyncSession, **filters) -> Optional[UserReadModel]:
+        """
+        Select only the read model's columns, so the row never enters the identity map. The model is
+        cached only when it was read from the primary and no write touched the cache while it was
+        loading: a lagging replica could otherwise put a row back that a write had just replaced.
+        """
+        generation = UserCacheService.generation()
+        query = select(*UserReadModel.columns()).filter_by(**filters)
+        result = await cls._execute_read(session, query)
+        row = result.first() if result else None
+        if row is None:
+            return None
+        model = UserReadModel.from_row(row)
+        if not Database.is_replica_session(session):
+            UserCacheService.put_loaded(model, generation)
+        return model
+
+    @classmethod
+    async def _load_read_models(cls, session: AsyncSession, column, values: List) -> List[UserReadModel]:
+        """Read models for every row whose `column` is one of `values`, in one `= ANY(...)` query; cached like `_load_read_model`."""
+        generation = UserCacheService.generation()
+        result = await cls._execute_read(session, select(*UserReadModel.columns()).where(column == any_(list(values))))
+        models = [UserReadModel.from_row(row) for row in result.all()]
+        if not Database.is_replica_session(session):
+            for model in models:
+                UserCacheService.put_loaded(model, generation)
+        return models
+
+    @classmethod
+    async def get_many_by_ids(cls, session: AsyncSession, user_ids: List[UUID]) -> List[UserReadModel]:
+        """Fetch the users with the given ids in one `id = ANY(...)` query, in the order requested; unknown ids are skipped."""
+        if not user_ids:
+            return []
+        found = {model.id: model for model in await cls._load_read_models(session, User.id, user_ids)}
+        return [found[user_id] for user_id in dict.fromkeys(user_ids) if user_id in found]
+
+    @classmethod
+    def loader(cls, session: AsyncSession) -> DataLoader:
+        """
+        The request's DataLoader of read models by id: concurrent lookups on `session` (`get_read_model`,
+        batch gets) merge into one query. It is kept in `session.info`, so it lives as long as the
+        request's session. Cached users are served without a query, and a lone id still goes through
+        the cross-request single flight.
+        """
+        loader = session.info.get("user_loader")
+        if loader is None:
+            async def load_users(user_ids: List[UUID]) -> Dict[UUID, UserReadModel]:
+                found = {}
+                for user_id in user_ids:
+                    model = UserCacheService.get_by_id(user_id)
+                    if model is not None:
+                        found[user_id] = model
+                missing = [user_id for user_id in user_ids if user_id not in found]
+                if len(missing) == 1:
+                    model = await cls._shared_read(
+                        session, ("get_read_model", missing[0]), lambda shared: cls._load_read_model(shared, id=missing[0])
+                    )
+                    if model is not None:
+                        found[model.id] = model
+                elif missing:
+                    found.update((model.id, model) for model in await cls.get_many_by_ids(session, missing))
+                return found
+            loader = session.info["user_loader"] = DataLoader(load_users, max_batch_size=settings.user_batch_get_max, name="users.loader")
+        return loader
+
+    @classmethod
+    async def get_many_by_emails(cls, session: AsyncSession, emails: List[str]) -> List[UserReadModel]:
+        """Fetch the users with the given emails in one `email = ANY(...)` query, in the order requested."""
+        if not emails:
+            return []
+        found = {model.email: model for model in await cls._load_read_models(session, User.email, emails)}
+        return [found[email] for email in dict.fromkeys(emails) if email in found]
+
     @classmethod
     async def create(cls, session: AsyncSession, user_data: Dict[str, str], email_service: EmailService) -> Optional[User]:
+        """
+        Insert a new user with a single INSERT ... ON CONFLICT DO NOTHING RETURNING statement.
+
+        A conflict on the email raises EmailAlreadyExistsError; a conflict on the generated nickname
+        is retried with one that NicknameService has checked is free. Returns None when the data is
+        invalid or the insert fails.
+        """
         try:
             validated_data = UserCreate(**user_data).model_dump()
-            
-            # Ensure email is unique
-            if await cls.get_by_email(session, validated_data['email']):
-                logger.error("User with the provided email already exists.")
+            validated_data['hashed_password'] = await hash_password_async(validated_data.pop('password'))
+            validated_data['verification_token'] = generate_verification_token()
+
+            # Collisions are rare in the nickname space, so the first candidate is inserted unchecked
+            nickname = generate_nickname()
+            for _ in range(NICKNAME_ATTEMPTS):
+                validated_data['nickname'] = nickname
+                query = pg_insert(User).values(**validated_data).on_conflict_do_nothing().returning(User)
+                result = await cls._execute_write(session, query)
+                new_user = result.scalars().first()
+                if new_user:
+                    NicknameService.record(1, 0)
+                    break
+                # Nothing inserted: find out which unique column clashed
+                if await cls.get_by_email(session, validated_data['email']):
+                    raise EmailAlreadyExistsError(validated_data['email'])
+                NicknameService.record(1, 1)
+                nickname = await NicknameService.allocate(session) or generate_nickname()
+            else:
+                logger.error("Could not allocate a free nickname for the new user.")
                 return None
-            
-            # Hash the password
-            validated_data['hashed_password'] = hash_password(validated_data.pop('password'))
-
-            # Generate unique nickname
-            new_nickname = generate_nickname()
-            while await cls.get_by_nickname(session, new_nickname):
-                new_nickname = generate_nickname()
-            validated_data['nickname'] = new_nickname
-
-            # Create and save the user
-            new_user = User(**validated_data)
-            new_user.verification_token = generate_verification_token()
-            session.add(new_user)
-            await session.commit()
-
-            # Send verification email
-            await email_service.send_verification_email(new_user)
+
+            # Send verification email once the user is committed
+            await after_commit(session, lambda: email_service.send_verification_email(new_user))
+            await after_commit(session, cls._count_changed)
             
             logger.info(f"User {new_user.id} created successfully.")
             return new_user
+        except (HashingQueueFullError, EmailAlreadyExistsError):
+            raise
         except ValidationError as e:
             logger.error(f"Validation error during user creation: {e}")
             return None
@@ -87,26 +301,53 @@ class UserService:
             return None
 
     @classmethod
-    async def update(cls, session: AsyncSession, user_id: UUID, update_data: Dict[str, str]) -> Optional[User]:
+    async def update(cls, session: AsyncSession, user_id: UUID, update_data: Dict[str, str], if_versions: Optional[Sequence[datetime]] = None) -> Optional[User]:
+        """
+        Apply `update_data` to the user. With `if_versions`, the update only happens while the user's
+        `updated_at` is one of them, and PreconditionFailedError is raised if it has moved on.
+        """
         try:
             validated_data = UserUpdate(**update_data).dict(exclude_unset=True)
 
             # Hash password if updated
             if 'password' in validated_data:
-                validated_data['hashed_password'] = hash_password(validated_data.pop('password'))
+                validated_data['hashed_password'] = await hash_password_async(validated_data.pop('password'))
 
-            # Update the user
-            query = update(User).where(User.id == user_id).values(**validated_data).execution_options(synchronize_session="fetch")
-            await cls._execute_query(session, query)
-            updated_user = await cls.get_by_id(session, user_id)
-            
-            if updated_user:
-                session.refresh(updated_user)
-                logger.info(f"User {user_id} updated successfully.")
-                return updated_user
-            else:
-                logger.error(f"User {user_id} not found after update.")
+            # Changing who the user is, or how they sign in, revokes their outstanding access tokens
+            revokes_tokens = bool(REVOKING_FIELDS.intersection(validated_data))
+            if revokes_tokens:
+                validated_data['token_version'] = User.token_version + 1
+
+            if not validated_data:
+                user = await cls.get_by_id(session, user_id)
+                if user is not None and if_versions is not None and user.updated_at not in if_versions:
+                    raise PreconditionFailedError(f"User {user_id} has changed")
+                return user
+
+            # Update the user and read the fresh row back in the same statement
+            query = update(User).where(User.id == user_id)
+            if if_versions is not None:
+                query = query.where(User.updated_at.in_(if_versions))
+            query = query.values(**validated_data).returning(User).execution_options(populate_existing=True)
+            result = await cls._execute_write(session, query)
+            updated_user = result.scalars().first()
+            if not updated_user:
+                if if_versions is not None and await cls.get_version(session, user_id) is not None:
+                    raise PreconditionFailedError(f"User {user_id} has changed")
+                logger.error(f"User {user_id} not found for update.")
                 return None
+            read_model = UserReadModel.from_user(updated_user)
+
+            def refresh_caches():
+                if revokes_tokens:
+                    TokenVersionService.invalidate(user_id)
+                UserCacheService.put(read_model)
+                invalidation_bus.publish("user", user_id, updated_user.token_version)
+            await after_commit(session, refresh_caches)
+            logger.info(f"User {user_id} updated successfully.")
+            return updated_user
+        except (HashingQueueFullError, PreconditionFailedError):
+            raise
         except ValidationError as e:
             logger.error(f"Validation error during user update: {e}")
             return None
@@ -117,12 +358,12 @@ class UserService:
     @classmethod
     async def delete(cls, session: AsyncSession, user_id: UUID) -> bool:
         try:
-            user = await cls.get_by_id(session, user_id)
-            if not user:
+            result = await cls._execute_write(session, delete(User).where(User.id == user_id).returning(User.id))
+            if result.scalar_one_or_none() is None:
                 logger.info(f"User with ID {user_id} not found.")
                 return False
-            await session.delete(user)
-            await session.commit()
+            await cls._invalidate_user_after_commit(session, user_id)
+            await after_commit(session, cls._count_changed)
             logger.info(f"User {user_id} deleted successfully.")
             return True
         except Exception as e:
@@ -130,53 +371,238 @@ class UserService:
             return False
 
     @classmethod
-    async def list_users(cls, session: AsyncSession, skip: int = 0, limit: int = 10) -> List[User]:
-        query = select(User).offset(skip).limit(limit)
-        result = await cls._execute_query(session, query)
-        return result.scalars().all() if result else []
+    async def list_users(cls, session: AsyncSession, skip: int = 0, limit: int = 10, fields: Optional[Sequence[str]] = None) -> List[UserSummary]:
+        """
+        A page of listing rows, projected to the columns a listing shows. Given `fields`, only those
+        columns (plus id, created_at and updated_at) are selected and the rows come back as plain
+        result rows; an empty `fields` reads just the page's versions.
+        """
+        query = cls._listing_query(fields).order_by(User.created_at, User.id).offset(skip).limit(limit)
+        result = await cls._execute_read(session, query)
+        return cls._listing_rows(result, fields) if result else []
+
+    @classmethod
+    def _listing_query(cls, fields: Optional[Sequence[str]]):
+        if fields is None:
+            return select(*UserSummary.columns())
+        # id and created_at order every page and build its cursors; updated_at versions it
+        names = dict.fromkeys(("id", "created_at", "updated_at", *fields))
+        return select(*(getattr(User, name) for name in names))
+
+    @classmethod
+    def _listing_rows(cls, result, fields: Optional[Sequence[str]]) -> List:
+        if fields is None:
+            return [UserSummary.from_row(row) for row in result]
+        return list(result)
+
+    @classmethod
+    async def list_users_by_cursor(cls, session: AsyncSession, limit: int = 10, cursor: Optional[str] = None, fields: Optional[Sequence[str]] = None) -> Tuple[List[UserSummary], Optional[str], Optional[str]]:
+        """
+        Keyset pagination over the (created_at, id) index. Returns the page together with the cursors
+        of the next and previous pages, None at either end. Raises InvalidCursorError for a bad cursor.
+        `fields` narrows the selected columns as in `list_users`.
+        """
+        query = cls._listing_query(fields)
+        direction = NEXT
+        if cursor:
+            created_at, user_id, direction = decode_cursor(cursor)
+            boundary = tuple_(User.created_at, User.id)
+            query = query.where(boundary > (created_at, user_id) if direction == NEXT else boundary < (created_at, user_id))
+        if direction == NEXT:
+            query = query.order_by(User.created_at, User.id)
+        else:
+            query = query.order_by(User.created_at.desc(), User.id.desc())
+        # One extra row tells whether another page follows without a count
+        result = await cls._execute_read(session, query.limit(limit + 1))
+        users = cls._listing_rows(result, fields)
+        has_more = len(users) > limit
+        users = users[:limit]
+        if direction != NEXT:
+            users.reverse()
+        if not users:
+            return [], None, None
+        more_after = has_more if direction == NEXT else True
+        more_before = bool(cursor) if direction == NEXT else has_more
+        next_cursor = encode_cursor(users[-1].created_at, users[-1].id) if more_after else None
+        prev_cursor = encode_cursor(users[0].created_at, users[0].id, PREV) if more_before else None
+        return users, next_cursor, prev_cursor
+
+    @classmethod
+    async def count(cls, session: AsyncSession) -> int:
+        """Exact number of users, served from the count cache between creates and deletes."""
+        total = cls.count_cache.get("users")
+        if total is None:
+            total = await cls._shared_read(session, ("count",), cls._load_count)
+        return total
+
+    @classmethod
+    async def _load_count(cls, session: AsyncSession) -> int:
+        result = await cls._execute_read(session, select(func.count()).select_from(User))
+        total = result.scalar_one()
+        cls.count_cache.set("users", total)
+        return total
+
+    @classmethod
+    async def estimated_count(cls, session: AsyncSession) -> int:
+        """
+        The planner's row estimate for the users table, a catalog lookup instead of a table scan.
+        Falls back to the exact count while the table has never been analyzed.
+        """
+        result = await cls._execute_read(session, text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'users'::regclass"))
+        estimate = result.scalar()
+        if estimate is None or estimate < 0:
+            return await cls.count(session)
+        return int(estimate)
+
+    @classmethod
+    def invalidate_count(cls):
+        cls.count_cache.delete("users")
+
+    @classmethod
+    def _count_changed(cls):
+        cls.invalidate_count()
+        invalidation_bus.publish("user_count", "users")
+
+    @classmethod
+    async def _invalidate_user_after_commit(cls, session: AsyncSession, user_id: UUID, version: Optional[int] = None):
+        """Once the write commits, drop the user's cached token version and profile here and on the other workers."""
+        def invalidate():
+            TokenVersionService.invalidate(user_id)
+            UserCacheService.invalidate(user_id)
+            invalidation_bus.publish("user", user_id, version)
+        await after_commit(session, invalidate)
 
     @classmethod
     async def register_user(cls, session: AsyncSession, user_data: Dict[str, str], get_email_service) -> Optional[User]:
         return await cls.create(session, user_data, get_email_service)
 
+    @classmethod
+    async def is_account_locked(cls, session: AsyncSession, email: str) -> bool:
+        result = await cls._execute_read(session, select(User.is_locked).where(User.email == email))
+        return bool(result.scalar())
+
     @classmethod
     async def login_user(cls, session: AsyncSession, email: str, password: str) -> Optional[User]:
+        """
+        Check the credentials of a user. Returns the user on success and None otherwise; raises
+        AccountLockedError, without checking the password, when the account is already locked.
+        The single SELECT by email serves both as the lock check and the user fetch.
+        """
         user = await cls.get_by_email(session, email)
         if user:
-            if not user.email_verified:
-                logger.warning(f"User {user.id} attempted login with unverified email.")
-                return None
             if user.is_locked:
                 logger.warning(f"User {user.id} is locked out.")
+                raise AccountLockedError(email)
+            if not user.email_verified:
+                logger.warning(f"User {user.id} attempted login with unverified email.")
                 return None
-            if verify_password(password, user.hashed_password):
-                user.failed_login_attempts = 0
-                user.last_login_at = datetime.now(timezone.utc)
-                session.add(user)
-                await session.commit()
+            if await verify_password_async(password, user.hashed_password):
+                if needs_rehash(user.hashed_password):
+                    _run_in_background(cls._rehash_password(user.id, password, user.hashed_password))
+                await cls._record_successful_login(session, user)
                 return user
             else:
-                user.failed_login_attempts += 1
-                if user.failed_login_attempts >= settings.max_login_attempts:
-                    user.is_locked = True
-                session.add(user)
-                await session.commit()
+                await cls._record_failed_login(session, user)
         return None
 
+    @classmethod
+    async def _record_successful_login(cls, session: AsyncSession, user: User):
+        """
+        Reset the failed-login counter, synchronously and only when it is non-zero, and hand the
+        login time to the write-behind buffer. Without a running buffer (scripts, tests) the time is
+        written along with the reset.
+        """
+        now = datetime.now(timezone.utc)
+        changes = {}
+        if user.failed_login_attempts:
+            changes['failed_login_attempts'] = 0
+        if LastLoginService.is_running():
+            LastLoginService.record(user.id, now)
+        else:
+            changes['last_login_at'] = now
+        if changes:
+            # Login bookkeeping isn't an edit: pin `updated_at` so the user's ETag and cached copy stay valid
+            changes['updated_at'] = User.updated_at
+            query = update(User).where(User.id == user.id).values(**changes).execution_options(synchronize_session=False)
+            await cls._execute_write(session, query)
+        set_committed_value(user, "failed_login_attempts", 0)
+        set_committed_value(user, "last_login_at", now)
+        UserCacheService.record_login(user.id, now)
+
+    @classmethod
+    async def _record_failed_login(cls, session: AsyncSession, user: User):
+        """
+        Count a failed login with one atomic UPDATE ... RETURNING, so concurrent attempts can't lose
+        increments. The attempt that reaches `max_login_attempts` locks the account and bumps its
+        token version; Postgres re-evaluates the row for concurrent updates, so only one of them does.
+        """
+        attempts = func.coalesce(User.failed_login_attempts, 0) + 1
+        locks_now = and_(User.is_locked.is_not(True), attempts >= settings.max_login_attempts)
+        query = (
+            update(User).where(User.id == user.id)
+            .values(
+                failed_login_attempts=attempts,
+                is_locked=or_(User.is_locked.is_(True), attempts >= settings.max_login_attempts),
+                token_version=case((locks_now, User.token_version + 1), else_=User.token_version),
+                # Only locking the account is a visible change; counting an attempt leaves the ETag alone
+                updated_at=case((locks_now, func.now()), else_=User.updated_at),
+            )
+            .returning(User.failed_login_attempts, User.is_locked, User.token_version)
+            .execution_options(synchronize_session=False)
+        )
+        result = await cls._execute_write(session, query)
+        row = result.first()
+        if row is None:
+            return
+        # Mirror the new values without marking the loaded user dirty, which would write them back
+        set_committed_value(user, "failed_login_attempts", row.failed_login_attempts)
+        set_committed_value(user, "is_locked", row.is_locked)
+        set_committed_value(user, "token_version", row.token_version)
+        if row.is_locked:
+            logger.warning(f"User {user.id} locked after {row.failed_login_attempts} failed logins.")
+            await cls._invalidate_user_after_commit(session, user.id, row.token_version)
+
+    @classmethod
+    async def _rehash_password(cls, user_id: UUID, password: str, old_hash: str):
+        """
+        Re-hash a password at the current bcrypt cost and persist it on a session of its own.
+        The update only applies while the stored hash is still `old_hash`, so a concurrent
+        password reset is never overwritten.
+        """
+        try:
+            new_hash = await hash_password_async(password)
+            async with Database.get_session_factory()() as session:
+                query = update(User).where(User.id == user_id, User.hashed_password == old_hash).values(hashed_password=new_hash, updated_at=User.updated_at)
+                await session.execute(query)
+                await session.commit()
+            logger.info(f"Password hash for user {user_id} upgraded to the current bcrypt cost.")
+        except Exception as e:
+            logger.error(f"Error rehashing password for user {user_id}: {e}")
+
     @classmethod
     async def reset_password(cls, session: AsyncSession, user_id: UUID, new_password: str) -> bool:
         try:
-            hashed_password = hash_password(new_password)
+            hashed_password = await hash_password_async(new_password)
             user = await cls.get_by_id(session, user_id)
             if user:
                 user.hashed_password = hashed_password
                 user.failed_login_attempts = 0
                 user.is_locked = False
+                user.token_version = (user.token_version or 0) + 1
                 session.add(user)
-                await session.commit()
+                await RefreshTokenService.revoke_all_for_user(session, user.id)
+                await commit_write(session)
+                await cls._invalidate_user_after_commit(session, user.id, user.token_version)
                 logger.info(f"Password for user {user.id} reset successfully.")
                 return True
             return False
+        except HashingQueueFullError:
+            raise
         except Exception as e:
             logger.error(f"Error resetting password for user {user_id}: {e}")
             return False
+
+# Evict entries that other workers changed
+invalidation_bus.subscribe("user", _evict_user)
+invalidation_bus.subscribe("user_count", lambda key, version: UserService.invalidate_count())
+invalidation_bus.subscribe_reset(_clear_user_caches)
@@ -0,0 +1,98 @@
+from builtins import RuntimeError, ValueError, float, getattr, int, len, str
+import asyncio
+from collections import deque
+from typing import Deque, Dict
+from logging import getLogger
+from app.utils.metrics import metrics
+from settings.config import settings
+
+logger = getLogger(__name__)
+
+class AdmissionRejectedError(RuntimeError):
+    """Raised when a request is shed because the wait queue is full or its queue deadline passed."""
+
+class AdmissionController:
+    """
+    Concurrency limiter for one class of routes.
+
+    Up to `max_concurrency` requests run at once, up to `max_queue` more wait in FIFO order, and a
+    waiting request is shed once it has queued for `queue_timeout` seconds. Admitted, queued and shed
+    requests are counted under `admission.<name>.*` in the metrics registry.
+    """
+    def __init__(self, name: str, max_concurrency: int, max_queue: int, queue_timeout: float):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def _shed(self, reason: str):
+        metrics.increment(f"admission.{self.name}.shed")
+        logger.warning("Shedding %s request: %s", self.name, reason)
+        raise AdmissionRejectedError(reason)
+
+    async def acquire(self):
+        """Wait for a slot, or raise `AdmissionRejectedError` if the request has to be shed."""
+        if self._active < self.max_concurrency and not self._waiters:
+            self._active += 1
+            metrics.increment(f"admission.{self.name}.admitted")
+            return
+        if len(self._waiters) >= self.max_queue:
+            self._shed("wait queue is full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        metrics.increment(f"admission.{self.name}.queued")
+        try:
+            await asyncio.wait_for(waiter, timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._discard(waiter)
+            self._shed("queue deadline exceeded")
+        except asyncio.CancelledError:
+            # The slot may have been handed over just before the caller went away.
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            self._discard(waiter)
+            raise
+        metrics.increment(f"admission.{self.name}.admitted")
+
+    def release(self):
+        """Hand the slot to the oldest live waiter, or free it if nobody is waiting."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._active -= 1
+
+    def _discard(self, waiter: asyncio.Future):
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+_controllers: Dict[str, AdmissionController] = {}
+
+def get_admission_controller(route_class: str) -> AdmissionController:
+    """Return the controller for a route class, configured from `admission_<route_class>_*` settings."""
+    controller = _controllers.get(route_class)
+    if controller is None:
+        controller = AdmissionController(
+            name=route_class,
+            max_concurrency=getattr(settings, f"admission_{route_class}_concurrency"),
+            max_queue=getattr(settings, f"admission_{route_class}_queue"),
+            queue_timeout=settings.admission_queue_timeout_seconds,
+        )
+        _controllers[route_class] = controller
+        metrics.register_gauge(f"admission.{route_class}.active", lambda: controller.active)
+        metrics.register_gauge(f"admission.{route_class}.waiting", lambda: controller.waiting)
+    return controller
@@ -0,0 +1,71 @@
+from builtins import bool, float, int, len, object, str
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+from app.utils.metrics import metrics
+
+_MISSING = object()
+
+class TTLCache:
+    """
+    Bounded LRU cache whose entries also expire after a per-entry time-to-live.
+
+    Reads and writes are guarded by a lock, so the cache can be shared by concurrent tasks and
+    threads. Lookups are counted as `cache.<name>.hits` / `cache.<name>.misses` in the metrics registry.
+    """
+    def __init__(self, name: str, max_size: int, ttl: Optional[float] = None):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        metrics.register_gauge(f"cache.{name}.size", lambda: len(self._entries))
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the live value stored under `key`, or `default` if it is missing or expired."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING and entry[1] > now:
+                self._entries.move_to_end(key)
+                value = entry[0]
+            else:
+                if entry is not _MISSING:
+                    del self._entries[key]
+                value = _MISSING
+        if value is _MISSING:
+            metrics.increment(f"cache.{self.name}.misses")
+            return default
+        metrics.increment(f"cache.{self.name}.hits")
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Store `value` for `ttl` seconds (the cache default if omitted), evicting the least recently used entry when full."""
+        ttl = self.ttl if ttl is None else ttl
+        if self.max_size <= 0 or ttl is None or ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: Hashable) -> bool:
+        """Drop the entry stored under `key`. Returns True if there was one."""
+        with self._lock:
+            return self._entries.pop(key, _MISSING) is not _MISSING
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def hit_ratio(self) -> float:
+        """Share of lookups answered from the cache since the metrics were last reset."""
+        hits = metrics.get(f"cache.{self.name}.hits")
+        total = hits + metrics.get(f"cache.{self.name}.misses")
+        return hits / total if total else 0.0
@@ -0,0 +1,61 @@
+from builtins import Exception, int, len, list, range, set
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+from app.utils.metrics import metrics
+
+class DataLoader:
+    """
+    Coalesces concurrent lookups into batched calls, in the style of the DataLoader pattern.
+
+    Every `load(key)` made in the same event-loop tick is collected and resolved by one call to
+    `batch_fn(keys)`, which returns a dict of the values it found; missing keys resolve to None.
+    Results are memoized for the loader's lifetime, so a loader should live for one request. Batches
+    run one at a time, which keeps them safe on a single AsyncSession.
+    """
+    def __init__(self, batch_fn: Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]], max_batch_size: int = 100, name: str = "dataloader"):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.name = name
+        self._cache: Dict[Hashable, asyncio.Future] = {}
+        self._queue: List[Hashable] = []
+        self._dispatch_scheduled = False
+        self._lock = asyncio.Lock()
+        self._tasks = set()
+
+    def load(self, key: Hashable) -> "asyncio.Future":
+        """Return a future for the value of `key`, batching it with the other loads of this tick."""
+        future = self._cache.get(key)
+        if future is not None:
+            return future
+        future = asyncio.get_running_loop().create_future()
+        self._cache[key] = future
+        self._queue.append(key)
+        if not self._dispatch_scheduled:
+            self._dispatch_scheduled = True
+            asyncio.get_running_loop().call_soon(self._start_dispatch)
+        return future
+
+    async def load_many(self, keys: List[Hashable]) -> List[Optional[Any]]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def _start_dispatch(self):
+        task = asyncio.ensure_future(self._dispatch())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self):
+        queue, self._queue = self._queue, []
+        self._dispatch_scheduled = False
+        for start in range(0, len(queue), self.max_batch_size):
+            batch = queue[start:start + self.max_batch_size]
+            async with self._lock:
+                try:
+                    values = await self.batch_fn(batch)
+                except Exception as e:
+                    for key in batch:
+                        self._cache.pop(key, None).set_exception(e)
+                    continue
+            metrics.increment(f"{self.name}.batches")
+            metrics.increment(f"{self.name}.keys", len(batch))
+            for key in batch:
+                self._cache[key].set_result(values.get(key))
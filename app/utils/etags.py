@@ -0,0 +1,65 @@
+from builtins import Exception, int, repr, str
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Sequence, Tuple
+from uuid import UUID
+
+# Weak ETags for conditional requests. A user's tag is its id and `updated_at` (as epoch microseconds),
+# so an If-Match header can be turned back into the version a PUT must still find; a sparse (`fields`)
+# representation appends a digest of its fieldset after a "+". A page's tag is a digest of everything
+# the page shows that can change: its rows' versions, the total and the cursors.
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+def _micros(value: datetime) -> int:
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+def user_etag(user_id: UUID, updated_at: Optional[datetime], fields: Optional[Sequence[str]] = None) -> str:
+    tag = f"{user_id}.{_micros(updated_at) if updated_at is not None else 0}"
+    if fields is not None:
+        tag += "+" + hashlib.blake2b(",".join(fields).encode(), digest_size=8).hexdigest()
+    return f'W/"{tag}"'
+
+def list_etag(*parts) -> str:
+    return f'W/"{hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()}"'
+
+def parse_user_etag(etag: str) -> Optional[Tuple[UUID, datetime]]:
+    """The (id, updated_at) a user ETag was built from, or None when it is not one of ours."""
+    tag = etag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    try:
+        user_id, micros = tag.strip('"').split("+", 1)[0].rsplit(".", 1)
+        return UUID(user_id), EPOCH + timedelta(microseconds=int(micros))
+    except Exception:
+        return None
+
+def _tags(header: str) -> List[str]:
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+def _opaque(tag: str) -> str:
+    return tag[2:] if tag.startswith("W/") else tag
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against the current ETag."""
+    if not if_none_match:
+        return False
+    tags = _tags(if_none_match)
+    return "*" in tags or _opaque(etag) in [_opaque(tag) for tag in tags]
+
+def if_match_versions(if_match: Optional[str], user_id: UUID) -> Optional[List[datetime]]:
+    """
+    The `updated_at` values an If-Match header allows for `user_id`. None means no precondition
+    (header absent or `*`); an empty list means none of the tags can match, so the request must fail.
+    """
+    if not if_match:
+        return None
+    tags = _tags(if_match)
+    if "*" in tags:
+        return None
+    versions = []
+    for tag in tags:
+        parsed = parse_user_etag(tag)
+        if parsed is not None and parsed[0] == user_id:
+            versions.append(parsed[1])
+    return versions
@@ -0,0 +1,36 @@
+from builtins import TypeError, isinstance, str, type
+from typing import Any
+from pydantic import BaseModel, TypeAdapter
+from pydantic_core import Url
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:  # optional; pydantic-core's serializer covers the same types, a little slower
+    orjson = None
+
+# Serializes whatever it is given (dicts, lists, models, UUIDs, datetimes, enums, URLs) without validating it
+_any_adapter = TypeAdapter(Any)
+
+def _orjson_default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, Url):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+def dumps(content: Any) -> bytes:
+    """Encode `content` to JSON bytes in one pass, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_orjson_default)
+    return _any_adapter.dump_json(content)
+
+class FastJSONResponse(Response):
+    """
+    JSON response rendered straight from already-trusted data. Returning it from an endpoint skips
+    FastAPI's response-model validation and the `jsonable_encoder` + stdlib `json` pass.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,23 @@
+from builtins import ValueError, dict, set, sorted, str, tuple
+from typing import Iterable, Optional, Tuple
+
+# Sparse fieldsets: a `fields=id,email,role` query parameter naming the response fields a client
+# wants, so only those columns are selected and serialized.
+
+class InvalidFieldsError(ValueError):
+    """Raised when a `fields` parameter names fields the response does not have."""
+
+def parse_fields(raw: Optional[str], allowed: Iterable[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Split a comma-separated `fields` parameter into field names, in the order given and without
+    duplicates. Returns None when the parameter is absent or blank, meaning every field.
+    """
+    if raw is None:
+        return None
+    fields = tuple(dict.fromkeys(name.strip() for name in raw.split(",") if name.strip()))
+    if not fields:
+        return None
+    unknown = sorted(set(fields) - set(allowed))
+    if unknown:
+        raise InvalidFieldsError(f"Unknown fields: {', '.join(unknown)}")
+    return fields
@@ -0,0 +1,216 @@
+from builtins import ConnectionError, Exception, ValueError, dict, float, int, isinstance, list, min, str
+import asyncio
+import json
+import uuid
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+import asyncpg
+from sqlalchemy.engine import make_url
+from app.utils.metrics import metrics
+import logging
+
+logger = logging.getLogger(__name__)
+
+class PostgresChannel:
+    """LISTEN/NOTIFY channel on a dedicated asyncpg connection, outside the SQLAlchemy pool."""
+    def __init__(self, database_url: str, channel: str, ping_interval: float = 15.0):
+        self.dsn = make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+        self.channel = channel
+        self.ping_interval = ping_interval
+        self._conn = None
+        self._closed = asyncio.Event()
+
+    async def connect(self, on_message: Callable[[str], None]):
+        self._conn = await asyncpg.connect(self.dsn)
+        self._conn.add_termination_listener(lambda conn: self._closed.set())
+        await self._conn.add_listener(self.channel, lambda conn, pid, channel, payload: on_message(payload))
+
+    async def publish(self, payload: str):
+        await self._conn.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+
+    async def wait_closed(self):
+        """Return once the connection is gone; a periodic ping catches connections that died silently."""
+        while not self._closed.is_set():
+            try:
+                await asyncio.wait_for(self._closed.wait(), timeout=self.ping_interval)
+            except asyncio.TimeoutError:
+                try:
+                    await self._conn.execute("SELECT 1")
+                except Exception as e:
+                    logger.warning(f"Invalidation channel ping failed: {e}")
+                    self._closed.set()
+
+    async def close(self):
+        self._closed.set()
+        if self._conn is not None and not self._conn.is_closed():
+            await self._conn.close()
+
+class FakeHub:
+    """In-memory stand-in for a Postgres server, connecting FakeChannels the way NOTIFY connects workers."""
+    def __init__(self):
+        self.channels: List["FakeChannel"] = []
+
+    def channel(self) -> "FakeChannel":
+        return FakeChannel(self)
+
+class FakeChannel:
+    """Channel on a FakeHub, for unit tests. `drop()` simulates a lost connection."""
+    def __init__(self, hub: FakeHub):
+        self.hub = hub
+        self._on_message = None
+        self._closed = asyncio.Event()
+
+    async def connect(self, on_message: Callable[[str], None]):
+        self._on_message = on_message
+        self.hub.channels.append(self)
+
+    async def publish(self, payload: str):
+        if self._closed.is_set():
+            raise ConnectionError("channel is closed")
+        for channel in list(self.hub.channels):
+            channel._on_message(payload)
+
+    async def wait_closed(self):
+        await self._closed.wait()
+
+    def drop(self):
+        if self in self.hub.channels:
+            self.hub.channels.remove(self)
+        self._closed.set()
+
+    async def close(self):
+        self.drop()
+
+class InvalidationBus:
+    """
+    Broadcasts cache invalidations between workers.
+
+    Writers call `publish(entity, key, version)` after they commit; the message travels as a compact
+    JSON NOTIFY payload and every other worker's listener runs the handlers subscribed to `entity`.
+    Workers skip their own messages, having already updated their local caches.
+
+    While the channel is down, publishes are dropped and the caches fall back to their TTLs. The
+    listener reconnects with exponential backoff and, once back, runs the reset handlers, since
+    messages sent in the meantime were missed.
+    """
+    def __init__(self, min_backoff: float = 0.5, max_backoff: float = 30.0):
+        self.origin = uuid.uuid4().hex[:12]
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.connected = False
+        self._handlers: Dict[str, List[Callable]] = defaultdict(list)
+        self._reset_handlers: List[Callable] = []
+        self._queue: Optional[asyncio.Queue] = None
+        self._runner: Optional[asyncio.Task] = None
+        metrics.register_gauge("cache_bus.connected", lambda: int(self.connected))
+
+    def configure(self, min_backoff: float, max_backoff: float):
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+
+    def subscribe(self, entity: str, handler: Callable[[str, Optional[int]], None]):
+        """Run `handler(key, version)` for every message about `entity` sent by another worker."""
+        self._handlers[entity].append(handler)
+
+    def subscribe_reset(self, handler: Callable[[], None]):
+        """Run `handler()` after a reconnect, to drop whatever may have gone stale while disconnected."""
+        self._reset_handlers.append(handler)
+
+    def publish(self, entity: str, key, version: Optional[int] = None):
+        """Queue an invalidation for the other workers. Never blocks; dropped while disconnected."""
+        if not self.connected:
+            metrics.increment("cache_bus.dropped")
+            return
+        payload = {"e": entity, "k": str(key), "o": self.origin}
+        if version is not None:
+            payload["v"] = version
+        self._queue.put_nowait(json.dumps(payload, separators=(",", ":")))
+
+    def handle(self, payload: str):
+        """Dispatch a received payload to the subscribed handlers."""
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            logger.warning(f"Ignoring malformed invalidation payload: {payload!r}")
+            return
+        if not isinstance(message, dict) or message.get("o") == self.origin:
+            return
+        metrics.increment("cache_bus.received")
+        for handler in self._handlers.get(message.get("e"), []):
+            try:
+                handler(message.get("k"), message.get("v"))
+            except Exception as e:
+                logger.error(f"Invalidation handler for {message.get('e')} failed: {e}")
+
+    def start(self, channel_factory: Callable[[], object]):
+        """Start listening on channels built by `channel_factory`, reconnecting whenever one is lost."""
+        if self._runner is None:
+            self._queue = asyncio.Queue()
+            self._runner = asyncio.ensure_future(self._run(channel_factory))
+
+    async def stop(self):
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+        self.connected = False
+
+    async def _run(self, channel_factory: Callable[[], object]):
+        backoff = self.min_backoff
+        connected_before = False
+        while True:
+            channel = sender = None
+            try:
+                channel = channel_factory()
+                await channel.connect(self.handle)
+                self.connected = True
+                backoff = self.min_backoff
+                if connected_before:
+                    metrics.increment("cache_bus.reconnects")
+                    self._reset()
+                connected_before = True
+                sender = asyncio.ensure_future(self._send(channel))
+                await channel.wait_closed()
+                logger.warning("Invalidation channel lost; caches fall back to TTL expiry until it reconnects.")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Invalidation channel unavailable, retrying in {backoff:.1f}s: {e}")
+            finally:
+                self.connected = False
+                if sender is not None:
+                    sender.cancel()
+                if channel is not None:
+                    await self._close_quietly(channel)
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+    async def _send(self, channel):
+        while True:
+            payload = await self._queue.get()
+            try:
+                await channel.publish(payload)
+                metrics.increment("cache_bus.published")
+            except Exception as e:
+                logger.warning(f"Failed to publish invalidation: {e}")
+                metrics.increment("cache_bus.dropped")
+                await self._close_quietly(channel)
+                return
+
+    async def _close_quietly(self, channel):
+        try:
+            await channel.close()
+        except Exception:
+            pass
+
+    def _reset(self):
+        for handler in self._reset_handlers:
+            try:
+                handler()
+            except Exception as e:
+                logger.error(f"Invalidation reset handler failed: {e}")
+
+invalidation_bus = InvalidationBus()
@@ -1,9 +1,10 @@
 from builtins import dict, int, max, str
-from typing import List, Callable
+from typing import List, Callable, Optional, Tuple
 from urllib.parse import urlencode
 from uuid import UUID
 
-from fastapi import Request
+from fastapi import FastAPI, Request
+from pydantic_core import Url
 from app.schemas.link_schema import Link
 from app.schemas.pagination_schema import PaginationLink
 
@@ -13,36 +14,91 @@ def create_link(rel: str, href: str, method: str = "GET", action: str = None) ->
 
 def create_pagination_link(rel: str, base_url: str, params: dict) -> PaginationLink:
     # Ensure parameters are added in a specific order
-    query_string = f"skip={params['skip']}&limit={params['limit']}"
-    return PaginationLink(rel=rel, href=f"{base_url}?{query_string}")
+    query_string = urlencode([(key, params[key]) for key in ("mode", "skip", "cursor", "limit", "fields") if params.get(key) is not None])
+    # We built the URL ourselves, so it skips model validation
+    return PaginationLink.model_construct(rel=rel, href=Url(f"{base_url}?{query_string}"), method="GET")
+
+USER_ACTIONS = [
+    ("self", "get_user", "GET", "view"),
+    ("update", "update_user", "PUT", "update"),
+    ("delete", "delete_user", "DELETE", "delete")
+]
+USER_ID_PLACEHOLDER = "{user_id}"
+
+# (rel, path template, method, action) per user action, filled in by compile_link_templates
+_user_link_templates: Optional[List[Tuple[str, str, str, str]]] = None
+
+def compile_link_templates(app: FastAPI):
+    """Resolve the user action routes to path templates once, so building links needs no route lookups."""
+    global _user_link_templates
+    _user_link_templates = [
+        (rel, app.url_path_for(action, user_id=USER_ID_PLACEHOLDER), method, action_desc)
+        for rel, action, method, action_desc in USER_ACTIONS
+    ]
 
 def create_user_links(user_id: UUID, request: Request) -> List[Link]:
     """
-    Generate navigation links for user actions.
+    Generate navigation links for user actions. Once the templates are compiled this is string
+    formatting against the request's base URL; before that it falls back to `url_for`.
     """
-    actions = [
-        ("self", "get_user", "GET", "view"),
-        ("update", "update_user", "PUT", "update"),
-        ("delete", "delete_user", "DELETE", "delete")
-    ]
+    if _user_link_templates is None:
+        return [
+            create_link(rel, str(request.url_for(action, user_id=str(user_id))), method, action_desc)
+            for rel, action, method, action_desc in USER_ACTIONS
+        ]
+    base_url = str(request.base_url).rstrip("/")
+    user_id = str(user_id)
     return [
-        create_link(rel, str(request.url_for(action, user_id=str(user_id))), method, action_desc)
-        for rel, action, method, action_desc in actions
+        Link.model_construct(rel=rel, href=Url(base_url + path.replace(USER_ID_PLACEHOLDER, user_id)), action=action_desc)
+        for rel, path, method, action_desc in _user_link_templates
     ]
 
-def generate_pagination_links(request: Request, skip: int, limit: int, total_items: int) -> List[PaginationLink]:
-    base_url = str(request.url)
-    total_pages = (total_items + limit - 1) // limit
+def generate_pagination_links(
+    request: Request,
+    skip: Optional[int],
+    limit: int,
+    total_items: Optional[int],
+    cursor: Optional[str] = None,
+    next_cursor: Optional[str] = None,
+    prev_cursor: Optional[str] = None,
+    has_more: Optional[bool] = None,
+    fields: Optional[str] = None,
+) -> List[PaginationLink]:
+    """
+    Build self/first/next/prev links. Offset pages (`skip` given) also get a "last" link when the
+    total is known; keyset pages (`skip` is None) link to the next and previous cursors instead, and
+    their links without a cursor ask for keyset mode explicitly.
+    `has_more`, when given, decides the offset "next" link without relying on the total.
+    A sparse `fields` selection is carried over into every link.
+    """
+    base_url = str(request.url).split("?", 1)[0]
+
+    def link(rel: str, params: dict) -> PaginationLink:
+        return create_pagination_link(rel, base_url, {**params, 'fields': fields})
+
+    if skip is None:
+        links = [
+            link("self", {'mode': None if cursor else 'cursor', 'cursor': cursor, 'limit': limit}),
+            link("first", {'mode': 'cursor', 'limit': limit}),
+        ]
+        if next_cursor:
+            links.append(link("next", {'cursor': next_cursor, 'limit': limit}))
+        if prev_cursor:
+            links.append(link("prev", {'cursor': prev_cursor, 'limit': limit}))
+        return links
+
     links = [
-        create_pagination_link("self", base_url, {'skip': skip, 'limit': limit}),
-        create_pagination_link("first", base_url, {'skip': 0, 'limit': limit}),
-        create_pagination_link("last", base_url, {'skip': max(0, (total_pages - 1) * limit), 'limit': limit})
+        link("self", {'skip': skip, 'limit': limit}),
+        link("first", {'skip': 0, 'limit': limit}),
     ]
+    if total_items is not None:
+        total_pages = (total_items + limit - 1) // limit
+        links.append(link("last", {'skip': max(0, (total_pages - 1) * limit), 'limit': limit}))
 
-    if skip + limit < total_items:
-        links.append(create_pagination_link("next", base_url, {'skip': skip + limit, 'limit': limit}))
+    if has_more if has_more is not None else skip + limit < total_items:
+        links.append(link("next", {'skip': skip + limit, 'limit': limit}))
 
     if skip > 0:
-        links.append(create_pagination_link("prev", base_url, {'skip': max(skip - limit, 0), 'limit': limit}))
+        links.append(link("prev", {'skip': max(skip - limit, 0), 'limit': limit}))
 
     return links
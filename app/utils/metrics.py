@@ -0,0 +1,47 @@
+from builtins import dict, float, sorted, str
+import threading
+from collections import defaultdict
+from typing import Callable, Dict
+
+class Metrics:
+    """
+    In-process registry of counters and gauges.
+
+    Counters are incremented by the code paths they describe; gauges are callables sampled
+    whenever a snapshot is taken. The registry is process-local, so each worker reports its own numbers.
+    """
+    def __init__(self):
+        self._counters: Dict[str, float] = defaultdict(int)
+        self._gauges: Dict[str, Callable[[], float]] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: float = 1):
+        """Add `value` to the counter called `name`."""
+        with self._lock:
+            self._counters[name] += value
+
+    def get(self, name: str) -> float:
+        """Return the current value of a counter, or 0 if it was never incremented."""
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def register_gauge(self, name: str, sample: Callable[[], float]):
+        """Register a callable that reports the current value of a gauge."""
+        with self._lock:
+            self._gauges[name] = sample
+
+    def snapshot(self) -> Dict[str, float]:
+        """Return all counters and freshly sampled gauges, sorted by name."""
+        with self._lock:
+            values = dict(self._counters)
+            gauges = dict(self._gauges)
+        for name, sample in gauges.items():
+            values[name] = sample()
+        return dict(sorted(values.items()))
+
+    def reset(self):
+        """Zero every counter. Gauges are left registered."""
+        with self._lock:
+            self._counters.clear()
+
+metrics = Metrics()
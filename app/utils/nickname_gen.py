@@ -1,10 +1,34 @@
-from builtins import str
+from builtins import int, len, list, open, set, str, tuple
 import random
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Tuple
 
+WORDLIST_DIR = Path(__file__).parent / "wordlists"
+NUMBER_DIGITS = 4
+
+_random = random.SystemRandom()
+
+@lru_cache(maxsize=None)
+def load_wordlist(name: str) -> Tuple[str, ...]:
+    """Load a bundled word list (one lowercase word per line) from app/utils/wordlists."""
+    with open(WORDLIST_DIR / f"{name}.txt", encoding="utf-8") as wordlist:
+        return tuple(word for word in (line.strip() for line in wordlist) if word)
+
+def nickname_space() -> int:
+    """Number of distinct nicknames the generator can produce."""
+    return len(load_wordlist("adjectives")) * len(load_wordlist("animals")) * 10 ** NUMBER_DIGITS
 
 def generate_nickname() -> str:
-    """Generate a URL-safe nickname using adjectives and animal names."""
-    adjectives = ["clever", "jolly", "brave", "sly", "gentle"]
-    animals = ["panda", "fox", "raccoon", "koala", "lion"]
-    number = random.randint(0, 999)
-    return f"{random.choice(adjectives)}_{random.choice(animals)}_{number}"
+    """Generate a URL-safe, alphanumeric nickname from an adjective, an animal name and a number."""
+    adjective = _random.choice(load_wordlist("adjectives"))
+    animal = _random.choice(load_wordlist("animals"))
+    number = _random.randrange(10 ** NUMBER_DIGITS)
+    return f"{adjective}{animal}{number:0{NUMBER_DIGITS}d}"
+
+def generate_nicknames(count: int) -> List[str]:
+    """Generate `count` distinct nicknames."""
+    nicknames = set()
+    while len(nicknames) < count:
+        nicknames.add(generate_nickname())
+    return list(nicknames)
@@ -0,0 +1,30 @@
+from builtins import Exception, ValueError, len, str
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+from uuid import UUID
+
+# Keyset cursors: a page boundary (created_at, id) plus the direction to read in, packed as
+# URL-safe base64 JSON so clients treat it as an opaque token.
+NEXT = "next"
+PREV = "prev"
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+def encode_cursor(created_at: datetime, user_id: UUID, direction: str = NEXT) -> str:
+    payload = json.dumps({"c": created_at.isoformat(), "i": str(user_id), "d": direction}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID, str]:
+    """Return the (created_at, id, direction) boundary packed into `cursor`."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        direction = payload.get("d", NEXT)
+        if direction not in (NEXT, PREV):
+            raise ValueError(f"unknown direction {direction!r}")
+        return datetime.fromisoformat(payload["c"]), UUID(payload["i"]), direction
+    except Exception as e:
+        raise InvalidCursorError(f"Invalid pagination cursor: {e}") from e
@@ -1,19 +1,51 @@
 # app/security.py
-from builtins import Exception, ValueError, bool, int, str
+from builtins import AttributeError, abs, Exception, IndexError, RuntimeError, ValueError, bool, float, int, len, range, sorted, str
+import asyncio
 import secrets
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
 import bcrypt
 from logging import getLogger
 
 # Set up logging
 logger = getLogger(__name__)
 
-def hash_password(password: str, rounds: int = 12) -> str:
+# Cost factor used when callers don't pass one; replaced by `calibrate_bcrypt_rounds` at startup.
+_bcrypt_rounds = 12
+# Cost steps a stored hash may differ from the target before it is re-hashed at login
+_rehash_tolerance = 0
+
+def get_bcrypt_rounds() -> int:
+    """Return the bcrypt cost factor new hashes are created with."""
+    return _bcrypt_rounds
+
+def set_bcrypt_rounds(rounds: int):
+    """Set the bcrypt cost factor new hashes are created with."""
+    global _bcrypt_rounds
+    if not 4 <= rounds <= 31:
+        raise ValueError("bcrypt rounds must be between 4 and 31")
+    _bcrypt_rounds = rounds
+
+def set_rehash_tolerance(steps: int):
+    """
+    Let stored hashes drift `steps` cost steps from the target before login re-hashes them. With a
+    calibrated cost, workers on different hardware (or a noisy calibration) can land one step apart;
+    without tolerance users would be re-hashed back and forth between them.
+    """
+    global _rehash_tolerance
+    if steps < 0:
+        raise ValueError("rehash tolerance must not be negative")
+    _rehash_tolerance = steps
+
+def hash_password(password: str, rounds: Optional[int] = None) -> str:
     """
     Hashes a password using bcrypt with a specified cost factor.
     
     Args:
         password (str): The plain text password to hash.
         rounds (int): The cost factor that determines the computational cost of hashing.
+            Defaults to the calibrated cost from `get_bcrypt_rounds`.
 
     Returns:
         str: The hashed password.
@@ -21,6 +53,8 @@ def hash_password(password: str, rounds: int = 12) -> str:
     Raises:
         ValueError: If hashing the password fails.
     """
+    if rounds is None:
+        rounds = get_bcrypt_rounds()
     try:
         salt = bcrypt.gensalt(rounds=rounds)
         hashed_password = bcrypt.hashpw(password.encode('utf-8'), salt)
@@ -49,5 +83,136 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         logger.error("Error verifying password: %s", e)
         raise ValueError("Authentication process encountered an unexpected error") from e
 
+def get_hash_rounds(hashed_password: str) -> Optional[int]:
+    """
+    Read the cost factor embedded in a bcrypt hash (`$2b$<cost>$...`).
+
+    Returns:
+        Optional[int]: The cost factor, or None if the value is not a bcrypt hash.
+    """
+    try:
+        return int(hashed_password.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+def needs_rehash(hashed_password: str, rounds: Optional[int] = None, tolerance: Optional[int] = None) -> bool:
+    """
+    Return True when a stored bcrypt hash was created with a cost more than `tolerance` steps away
+    from the target cost (by default the tolerance set through `set_rehash_tolerance`).
+    """
+    stored_rounds = get_hash_rounds(hashed_password)
+    target_rounds = rounds if rounds is not None else get_bcrypt_rounds()
+    tolerance = tolerance if tolerance is not None else _rehash_tolerance
+    return stored_rounds is not None and abs(stored_rounds - target_rounds) > tolerance
+
+def measure_hash_time(rounds: int, samples: int = 3) -> float:
+    """Return the median time in milliseconds one bcrypt hash at `rounds` takes on this host."""
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        bcrypt.hashpw(b"calibration-password", bcrypt.gensalt(rounds=rounds))
+        timings.append((time.perf_counter() - started) * 1000)
+    return sorted(timings)[len(timings) // 2]
+
+def calibrate_bcrypt_rounds(target_ms: float, min_rounds: int = 10, max_rounds: int = 15) -> int:
+    """
+    Pick the highest bcrypt cost whose hash time on this host stays within `target_ms`.
+
+    Only `min_rounds` is measured; every further round doubles the work, so higher costs are
+    extrapolated instead of timed. The result is clamped to `[min_rounds, max_rounds]`.
+    """
+    elapsed_ms = measure_hash_time(min_rounds)
+    rounds = min_rounds
+    while rounds < max_rounds and elapsed_ms * 2 <= target_ms:
+        rounds += 1
+        elapsed_ms *= 2
+    logger.info("Calibrated bcrypt cost to %d rounds (~%.0f ms per hash, target %.0f ms)", rounds, elapsed_ms, target_ms)
+    return rounds
+
 def generate_verification_token():
-    return secrets.token_urlsafe(16)  # Generates a secure 16-byte URL-safe token
\ No newline at end of file
+    return secrets.token_urlsafe(16)  # Generates a secure 16-byte URL-safe token
+
+class HashingQueueFullError(RuntimeError):
+    """Raised when the password hashing pool has no free worker and its wait queue is full."""
+
+class PasswordHasher:
+    """
+    Runs bcrypt hashing and verification on a dedicated worker pool so the event loop stays responsive.
+
+    At most `workers + queue_size` jobs are accepted at once; further submissions fail fast with
+    `HashingQueueFullError` instead of piling up behind the pool.
+    """
+    def __init__(self, workers: int = 4, queue_size: int = 64, executor: str = "thread"):
+        if executor not in ("thread", "process"):
+            raise ValueError("executor must be 'thread' or 'process'")
+        self.workers = workers
+        self.queue_size = queue_size
+        self.executor_kind = executor
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        """Number of hashing jobs currently running or waiting for a worker."""
+        return self._pending
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def _submit(self, func, *args):
+        if self._pending >= self.workers + self.queue_size:
+            logger.warning("Password hashing queue is full (%d pending jobs)", self._pending)
+            raise HashingQueueFullError("Password hashing queue is full")
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self._pending -= 1
+
+    async def hash(self, password: str, rounds: Optional[int] = None) -> str:
+        """Awaitable counterpart of `hash_password`."""
+        # Resolve the cost here: process-pool workers don't see this process's calibrated value.
+        return await self._submit(hash_password, password, rounds if rounds is not None else get_bcrypt_rounds())
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Awaitable counterpart of `verify_password`."""
+        return await self._submit(verify_password, plain_password, hashed_password)
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker pool; a new one is created lazily on the next submission."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+_password_hasher: Optional[PasswordHasher] = None
+
+def get_password_hasher() -> PasswordHasher:
+    """Return the process-wide password hasher, creating it from settings on first use."""
+    global _password_hasher
+    if _password_hasher is None:
+        from settings.config import settings
+        _password_hasher = PasswordHasher(
+            workers=settings.password_hash_workers,
+            queue_size=settings.password_hash_queue_size,
+            executor=settings.password_hash_executor,
+        )
+    return _password_hasher
+
+def shutdown_password_hasher(wait: bool = True):
+    """Release the worker pool of the process-wide password hasher."""
+    if _password_hasher is not None:
+        _password_hasher.shutdown(wait=wait)
+
+async def hash_password_async(password: str, rounds: Optional[int] = None) -> str:
+    """Hash a password on the bcrypt worker pool without blocking the event loop."""
+    return await get_password_hasher().hash(password, rounds)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the bcrypt worker pool without blocking the event loop."""
+    return await get_password_hasher().verify(plain_password, hashed_password)
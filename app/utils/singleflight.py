@@ -0,0 +1,37 @@
+from builtins import len, str
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+from app.utils.metrics import metrics
+
+class SingleFlight:
+    """
+    Collapses identical concurrent calls into one.
+
+    The first `do(key, fn)` runs `fn()`; calls with the same key that arrive while it is in flight
+    await the same task instead of running their own, and all of them get its result or exception.
+    Nothing is cached: once the task finishes, the next call runs `fn()` again. Waiters are shielded,
+    so a cancelled caller never cancels the shared task. Counted as
+    `singleflight.<name>.executed` / `singleflight.<name>.deduplicated`.
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[Hashable, "asyncio.Task"] = {}
+        metrics.register_gauge(f"singleflight.{name}.inflight", lambda: len(self._inflight))
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            metrics.increment(f"singleflight.{self.name}.executed")
+        else:
+            metrics.increment(f"singleflight.{self.name}.deduplicated")
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: "asyncio.Task"):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Retrieve the outcome so a task whose callers all went away doesn't log "never retrieved"
+        if not task.cancelled():
+            task.exception()
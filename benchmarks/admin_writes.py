@@ -0,0 +1,88 @@
+"""
+File: admin_writes.py
+
+Overview:
+Measures the throughput and latency of the admin write endpoints, `PUT /users/{id}` and
+`DELETE /users/{id}`, on a running instance of the API. The users it updates and deletes are
+created through `POST /users/` first; that setup phase is not measured. Compare runs before and
+after a change to see the effect of fewer round trips per write.
+
+Usage:
+    python benchmarks/admin_writes.py --base-url http://localhost --admin-token <jwt> --users 200 --concurrency 16
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+import httpx
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def create_users(client, headers, count, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def create(index):
+        async with semaphore:
+            response = await client.post("/users/", headers=headers, json={
+                "email": f"bench-{uuid.uuid4().hex[:12]}@example.com",
+                "password": "Benchmark*Pass123",
+            })
+            response.raise_for_status()
+            return response.json()["id"]
+
+    return await asyncio.gather(*(create(index) for index in range(count)))
+
+
+async def measure(label, user_ids, concurrency, request):
+    queue = asyncio.Queue()
+    for user_id in user_ids:
+        queue.put_nowait(user_id)
+    samples = []
+
+    async def worker():
+        while not queue.empty():
+            user_id = queue.get_nowait()
+            started = time.perf_counter()
+            response = await request(user_id)
+            samples.append((time.perf_counter() - started) * 1000)
+            response.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    print(
+        f"{label:>6}: {len(samples)} requests in {elapsed:.2f}s ({len(samples) / elapsed:.0f} req/s) | "
+        f"p50={statistics.median(samples):.1f}ms p99={percentile(samples, 99):.1f}ms max={max(samples):.1f}ms"
+    )
+
+
+async def run(args):
+    headers = {"Authorization": f"Bearer {args.admin_token}"}
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as client:
+        user_ids = await create_users(client, headers, args.users, min(args.concurrency, 4))
+        await measure("PUT", user_ids, args.concurrency, lambda user_id: client.put(
+            f"/users/{user_id}", headers=headers, json={"bio": f"benchmark {time.time()}"}))
+        await measure("DELETE", user_ids, args.concurrency, lambda user_id: client.delete(
+            f"/users/{user_id}", headers=headers))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput of admin PUT and DELETE /users/{id}")
+    parser.add_argument("--base-url", default="http://localhost")
+    parser.add_argument("--admin-token", required=True, help="Bearer token of an ADMIN or MANAGER user")
+    parser.add_argument("--users", type=int, default=200, help="Users created, then updated and deleted")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent requests per phase")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+File: bcrypt_cost.py
+
+Overview:
+Reports how many bcrypt hashes per second one core of the current host sustains at each cost factor,
+and which cost `calibrate_bcrypt_rounds` would pick for a given latency budget. Use it to choose
+`bcrypt_target_ms` (or a fleet-wide `bcrypt_rounds`) from the CPU you are willing to spend per login.
+
+Usage:
+    python benchmarks/bcrypt_cost.py --min-rounds 8 --max-rounds 14 --target-ms 250
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import bcrypt
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.security import calibrate_bcrypt_rounds
+
+
+def hashes_per_second(rounds, min_seconds):
+    salt = bcrypt.gensalt(rounds=rounds)
+    count = 0
+    started = time.perf_counter()
+    while True:
+        bcrypt.hashpw(b"benchmark-password", salt)
+        count += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds and count >= 3:
+            return count / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="bcrypt hashes per second per core at each cost")
+    parser.add_argument("--min-rounds", type=int, default=8)
+    parser.add_argument("--max-rounds", type=int, default=14)
+    parser.add_argument("--seconds", type=float, default=2.0, help="Minimum time spent measuring each cost")
+    parser.add_argument("--target-ms", type=float, default=250.0, help="Latency budget passed to the calibration")
+    args = parser.parse_args()
+
+    print(f"{'cost':>4} {'ms/hash':>10} {'hashes/s/core':>14} {'hashes/s/host':>14}")
+    cores = os.cpu_count() or 1
+    for rounds in range(args.min_rounds, args.max_rounds + 1):
+        rate = hashes_per_second(rounds, args.seconds)
+        print(f"{rounds:>4} {1000 / rate:>10.1f} {rate:>14.2f} {rate * cores:>14.2f}")
+    chosen = calibrate_bcrypt_rounds(args.target_ms, args.min_rounds, args.max_rounds)
+    print(f"calibrated cost for a {args.target_ms:.0f} ms budget: {chosen} ({cores} cores)")
+
+
+if __name__ == "__main__":
+    main()
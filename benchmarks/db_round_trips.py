@@ -0,0 +1,128 @@
+"""
+File: db_round_trips.py
+
+Overview:
+Counts the database round trips (BEGIN, statements, COMMIT/ROLLBACK) each user endpoint makes, by
+driving the app in-process against the configured database and listening to SQLAlchemy engine events.
+Run it on two checkouts to compare endpoints before and after a change; it only relies on APIs the
+original tree already had (`Database._engine`, `create_access_token`), falling back to them where a
+newer helper is missing.
+
+The script creates its own admin user (and the schema, with --create-schema) and removes the user
+again at the end. Verification emails are replaced by a no-op so no mail is sent.
+
+Usage:
+    python benchmarks/db_round_trips.py [--create-schema]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import uuid
+from collections import Counter
+
+import httpx
+from sqlalchemy import delete, event
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import Base, Database
+from app.dependencies import get_email_service, get_settings
+from app.main import app
+from app.models.user_model import User, UserRole
+from app.utils.security import hash_password
+
+try:
+    from app.services.jwt_service import create_user_access_token
+except ImportError:  # checkouts from before token versioning, so the "before" side can be measured too
+    from app.services.jwt_service import create_access_token
+
+    def create_user_access_token(user):
+        return create_access_token(data={"sub": user.email, "role": user.role.name})
+
+PASSWORD = "Benchmark*Pass123"
+
+
+class NoopEmailService:
+    async def send_verification_email(self, user):
+        return None
+
+
+def install_counters(engine, counts):
+    @event.listens_for(engine, "before_cursor_execute")
+    def on_statement(conn, cursor, statement, parameters, context, executemany):
+        counts["statements"] += 1
+
+    @event.listens_for(engine, "begin")
+    def on_begin(conn):
+        counts["begin"] += 1
+
+    @event.listens_for(engine, "commit")
+    def on_commit(conn):
+        counts["commit"] += 1
+
+    @event.listens_for(engine, "rollback")
+    def on_rollback(conn):
+        counts["rollback"] += 1
+
+
+async def run(args):
+    settings = get_settings()
+    Database.initialize(settings.database_url)
+    engine = Database._engine
+    if args.create_schema:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    admin = User(
+        nickname=f"bench{uuid.uuid4().hex[:10]}",
+        email=f"bench-{uuid.uuid4().hex[:8]}@example.com",
+        hashed_password=hash_password(PASSWORD),
+        role=UserRole.ADMIN,
+        email_verified=True,
+    )
+    async with Database.get_session_factory()() as session:
+        session.add(admin)
+        await session.commit()
+
+    counts = Counter()
+    install_counters(engine.sync_engine, counts)
+    app.dependency_overrides[get_email_service] = NoopEmailService
+    headers = {"Authorization": f"Bearer {create_user_access_token(admin)}"}
+    created_email = f"bench-created-{uuid.uuid4().hex[:8]}@example.com"
+
+    async with httpx.AsyncClient(app=app, base_url="http://testserver") as client:
+        async def measure(label, method, url, **kwargs):
+            counts.clear()
+            response = await client.request(method, url, **kwargs)
+            total = sum(counts.values())
+            print(f"{label:<26} {response.status_code:>4} round trips={total:>2} "
+                  f"(begin={counts['begin']} statements={counts['statements']} "
+                  f"commit={counts['commit']} rollback={counts['rollback']})")
+            return response
+
+        created = await measure("POST /users/", "POST", "/users/", headers=headers,
+                                json={"email": created_email, "password": PASSWORD})
+        user_id = created.json().get("id", admin.id) if created.status_code == 201 else admin.id
+        await measure("GET /users/{id}", "GET", f"/users/{user_id}", headers=headers)
+        await measure("GET /users/?limit=10", "GET", "/users/?limit=10", headers=headers)
+        await measure("PUT /users/{id}", "PUT", f"/users/{user_id}", headers=headers, json={"bio": "benchmark"})
+        await measure("POST /login/", "POST", "/login/", data={"username": admin.email, "password": PASSWORD})
+        await measure("DELETE /users/{id}", "DELETE", f"/users/{user_id}", headers=headers)
+
+    app.dependency_overrides.clear()
+    async with Database.get_session_factory()() as session:
+        await session.execute(delete(User).where(User.email.in_([admin.email, created_email])))
+        await session.commit()
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Database round trips per user endpoint")
+    parser.add_argument("--create-schema", action="store_true", help="Create missing tables before measuring")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+File: json_responses.py
+
+Overview:
+Compares the standard response path of `GET /users/?limit=100` with the fast JSON mode
+(`fast_json_responses`). The standard path builds a `UserResponse` per row, after which FastAPI
+re-validates the page against the response model, runs `jsonable_encoder` and encodes with stdlib
+`json`. The fast path encodes the rows to bytes in one pass, with orjson when it is installed.
+
+Two modes:
+- `serialize` (default) times only the response building and encoding of a synthetic 100-user
+  page, in-process. It needs no database.
+- `http` drives the real app in-process against the configured database and reports requests per
+  second for each setting. It creates its own admin user (and, with --seed, throwaway users) and
+  removes them again at the end.
+
+Usage:
+    python benchmarks/json_responses.py --mode serialize --rounds 2000
+    python benchmarks/json_responses.py --mode http --requests 2000 --concurrency 16 [--seed 100]
+"""
+
+import argparse
+import asyncio
+import datetime
+import os
+import statistics
+import sys
+import time
+import uuid
+
+import httpx
+from sqlalchemy import delete
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.routing import serialize_response
+
+from app.database import Database
+from app.dependencies import get_settings
+from app.main import app
+from app.models.user_model import User, UserRole
+from app.models.user_read_model import UserSummary
+from app.routers import user_routes
+from app.schemas.user_schemas import CountMode, UserListResponse, UserResponse
+from app.services.jwt_service import create_user_access_token
+from app.utils import fast_json
+from app.utils.fast_json import FastJSONResponse
+from app.utils.link_generation import compile_link_templates, generate_pagination_links
+
+SEED_PREFIX = "jsonbench"
+
+
+def synthetic_page(count):
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return [
+        UserSummary.from_row([
+            uuid.uuid4(), f"nick{index}", f"user{index}@example.com", "Jane", "Doe", "Benchmark user " * 8,
+            "https://example.com/p.jpg", "https://linkedin.com/in/jane", "https://github.com/jane",
+            UserRole.AUTHENTICATED, False, now, now,
+        ])
+        for index in range(count)
+    ]
+
+
+def make_request():
+    return Request({
+        "type": "http", "method": "GET", "path": "/users/", "query_string": b"limit=100", "root_path": "",
+        "headers": [(b"host", b"testserver")], "scheme": "http", "server": ("testserver", 80),
+        "app": app, "router": app.router,
+    })
+
+
+def page_meta(request, users):
+    return dict(
+        total=1000, total_mode=CountMode.EXACT, has_more=True, page=None, size=len(users),
+        next_cursor="abc", prev_cursor=None,
+        links=generate_pagination_links(request, None, len(users), 1000, next_cursor="abc", has_more=True),
+    )
+
+
+async def standard_body(request, users, field):
+    page = UserListResponse(items=[UserResponse.model_construct(**user.as_dict()) for user in users], **page_meta(request, users))
+    content = await serialize_response(field=field, response_content=page)
+    return JSONResponse(content).body
+
+
+def fast_body(request, users):
+    content = UserListResponse(items=[], **page_meta(request, users)).model_dump(mode="json")
+    content["items"] = [{name: getattr(user, name) for name in user_routes.USER_RESPONSE_FIELDS} for user in users]
+    return FastJSONResponse(content).body
+
+
+async def run_serialize(args):
+    compile_link_templates(app)
+    field = next(route for route in app.routes if getattr(route, "name", None) == "list_users").response_field
+    request = make_request()
+    users = synthetic_page(args.users)
+
+    async def time_it(build):
+        await build()
+        timings = []
+        for _ in range(args.rounds):
+            started = time.perf_counter()
+            await build()
+            timings.append(time.perf_counter() - started)
+        return statistics.median(timings)
+
+    async def fast():
+        return fast_body(request, users)
+
+    standard = await time_it(lambda: standard_body(request, users, field))
+    fast_with_default = await time_it(fast)
+    orjson, fast_json.orjson = fast_json.orjson, None
+    fast_pydantic = await time_it(fast)
+    fast_json.orjson = orjson
+
+    print(f"{'response path':<22} {'median ms/page':>15} {'pages/s':>10}")
+    rows = [("standard", standard), ("fast (pydantic-core)", fast_pydantic)]
+    if orjson is not None:
+        rows.append(("fast (orjson)", fast_with_default))
+    for name, median in rows:
+        print(f"{name:<22} {median * 1000:>15.3f} {1 / median:>10.0f}")
+
+
+async def run_http(args):
+    Database.initialize(get_settings().database_url)
+    admin = User(
+        nickname=f"{SEED_PREFIX}{uuid.uuid4().hex[:10]}", email=f"{SEED_PREFIX}-{uuid.uuid4().hex[:8]}@example.com",
+        hashed_password="x" * 60, role=UserRole.ADMIN, email_verified=True,
+    )
+    async with Database.get_session_factory()() as session:
+        session.add(admin)
+        session.add_all(
+            User(nickname=f"{SEED_PREFIX}{uuid.uuid4().hex[:12]}", email=f"{SEED_PREFIX}-{uuid.uuid4().hex[:12]}@example.com", hashed_password="x" * 60)
+            for _ in range(args.seed)
+        )
+        await session.commit()
+    headers = {"Authorization": f"Bearer {create_user_access_token(admin)}"}
+
+    try:
+        async with httpx.AsyncClient(app=app, base_url="http://testserver") as client:
+            async def throughput():
+                semaphore = asyncio.Semaphore(args.concurrency)
+
+                async def one():
+                    async with semaphore:
+                        response = await client.get("/users/?limit=100", headers=headers)
+                        response.raise_for_status()
+
+                started = time.perf_counter()
+                await asyncio.gather(*(one() for _ in range(args.requests)))
+                return args.requests / (time.perf_counter() - started)
+
+            print(f"{'fast_json_responses':<20} {'requests/s':>12}")
+            for enabled in (False, True):
+                user_routes.fast_json = enabled
+                await throughput()
+                print(f"{str(enabled):<20} {await throughput():>12.0f}")
+    finally:
+        async with Database.get_session_factory()() as session:
+            await session.execute(delete(User).where(User.nickname.like(f"{SEED_PREFIX}%")))
+            await session.commit()
+        await Database._engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=("serialize", "http"), default="serialize")
+    parser.add_argument("--users", type=int, default=100, help="rows per synthetic page (serialize mode)")
+    parser.add_argument("--rounds", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=0, help="insert this many throwaway users first (http mode)")
+    args = parser.parse_args()
+    asyncio.run(run_serialize(args) if args.mode == "serialize" else run_http(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+File: list_projection.py
+
+Overview:
+Compares two ways of building one page of the user listing against the configured database:
+hydrating full `User` ORM instances and re-validating them with `UserResponse.model_validate`
+(the old read path), and selecting only the listing columns into `UserSummary` views that go
+straight into `UserResponse.model_construct` (the projected read path). For each it reports the
+median time per page and the peak memory allocated while building it, measured with tracemalloc.
+
+Pages of --page-size rows are read from the start of the (created_at, id) ordering. With --seed N the
+script first inserts N throwaway users (and the schema, with --create-schema) and deletes them again
+at the end.
+
+Usage:
+    python benchmarks/list_projection.py --page-size 1000 --rounds 20 [--seed 1000] [--create-schema]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+import uuid
+
+from sqlalchemy import delete, select
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import Base, Database
+from app.dependencies import get_settings
+from app.models.user_model import User
+from app.schemas.user_schemas import UserResponse
+from app.services.user_service import UserService
+
+SEED_PREFIX = "listbench"
+
+
+async def orm_page(session, page_size):
+    result = await session.execute(select(User).order_by(User.created_at, User.id).limit(page_size))
+    users = result.scalars().all()
+    return [UserResponse.model_validate(user) for user in users]
+
+
+async def projected_page(session, page_size):
+    users = await UserService.list_users(session, 0, page_size)
+    return [UserResponse.model_construct(**user.as_dict()) for user in users]
+
+
+async def measure(build, page_size, rounds):
+    timings, peaks, rows = [], [], 0
+    for _ in range(rounds):
+        # A fresh session per round, so neither path is helped by an identity map left from the last one
+        async with Database.get_session_factory()() as session:
+            tracemalloc.start()
+            started = time.perf_counter()
+            page = await build(session, page_size)
+            timings.append(time.perf_counter() - started)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+            rows = len(page)
+    return rows, statistics.median(timings), statistics.median(peaks)
+
+
+async def seed(count):
+    async with Database.get_session_factory()() as session:
+        session.add_all(
+            User(
+                nickname=f"{SEED_PREFIX}{uuid.uuid4().hex[:12]}",
+                email=f"{SEED_PREFIX}-{uuid.uuid4().hex[:12]}@example.com",
+                hashed_password="x" * 60,
+                bio="Benchmark user " * 8,
+            )
+            for _ in range(count)
+        )
+        await session.commit()
+
+
+async def unseed():
+    async with Database.get_session_factory()() as session:
+        await session.execute(delete(User).where(User.nickname.like(f"{SEED_PREFIX}%")))
+        await session.commit()
+
+
+async def run(args):
+    Database.initialize(get_settings().database_url)
+    if args.create_schema:
+        async with Database._engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    if args.seed:
+        await seed(args.seed)
+    try:
+        # Warm up connections and statement caches before measuring
+        await measure(orm_page, args.page_size, 1)
+        await measure(projected_page, args.page_size, 1)
+        print(f"{'read path':<12} {'rows':>6} {'median ms':>10} {'peak KiB':>10}")
+        for name, build in (("orm", orm_page), ("projected", projected_page)):
+            rows, median, peak = await measure(build, args.page_size, args.rounds)
+            print(f"{name:<12} {rows:>6} {median * 1000:>10.2f} {peak / 1024:>10.1f}")
+    finally:
+        if args.seed:
+            await unseed()
+        await Database._engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0, help="insert this many throwaway users first")
+    parser.add_argument("--create-schema", action="store_true")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
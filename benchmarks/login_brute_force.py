@@ -0,0 +1,61 @@
+"""
+File: login_brute_force.py
+
+Overview:
+Fires a burst of concurrent wrong-password `POST /login/` requests at one account of a running
+instance of the API, the way a parallel brute-force attack would. Every 401 is a password guess the
+server actually checked; once the account locks, attempts answer 400. With atomic failure accounting
+every failure is counted, so the only guesses checked beyond `max_login_attempts` are the ones
+already in flight when the lock committed (bounded by the login admission limit). With
+read-modify-write accounting concurrent failures overwrite each other's increments and the lock
+arrives far later. 503s are requests shed by admission control and never reached the password check.
+
+The target account is locked at the end of the run; unlock or reset it before running again.
+
+Usage:
+    python benchmarks/login_brute_force.py --base-url http://localhost --email <victim email> \
+        --max-login-attempts 3 --attempts 200 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import time
+from collections import Counter
+
+import httpx
+
+
+async def run(args):
+    semaphore = asyncio.Semaphore(args.concurrency)
+    statuses = Counter()
+    limits = httpx.Limits(max_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as client:
+        async def attempt(index):
+            async with semaphore:
+                response = await client.post("/login/", data={"username": args.email, "password": f"WrongGuess!{index}"})
+                statuses[response.status_code] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(attempt(index) for index in range(args.attempts)))
+        elapsed = time.perf_counter() - started
+
+    checked = statuses[401]
+    print(f"{args.attempts} attempts in {elapsed:.2f}s ({args.attempts / elapsed:.0f} req/s)")
+    print(f"status codes: {dict(sorted(statuses.items()))}")
+    print(f"password guesses checked: {checked} (max_login_attempts {args.max_login_attempts}, "
+          f"{max(0, checked - args.max_login_attempts)} in flight when the account locked)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel brute-force load against one account")
+    parser.add_argument("--base-url", default="http://localhost")
+    parser.add_argument("--email", required=True, help="Email of a verified, unlocked account to attack")
+    parser.add_argument("--max-login-attempts", type=int, default=3, help="The server's max_login_attempts setting")
+    parser.add_argument("--attempts", type=int, default=200, help="Total wrong-password attempts")
+    parser.add_argument("--concurrency", type=int, default=50, help="Attempts in flight at once")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
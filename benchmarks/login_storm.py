@@ -0,0 +1,75 @@
+"""
+File: login_storm.py
+
+Overview:
+Measures the latency of `GET /users/{id}` on a running instance of the API while a storm of concurrent
+`POST /login/` requests keeps the bcrypt workers busy. With hashing on the event loop the read endpoint
+stalls behind every login; with the worker pool its p99 should stay close to the idle baseline.
+
+Usage:
+    python benchmarks/login_storm.py --base-url http://localhost --admin-token <jwt> --user-id <uuid> \
+        --email <login email> --password <login password> --logins 32 --duration 20
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def login_worker(client, email, password, stop_at):
+    attempts = 0
+    while time.perf_counter() < stop_at:
+        await client.post("/login/", data={"username": email, "password": password})
+        attempts += 1
+    return attempts
+
+
+async def read_worker(client, user_id, token, stop_at, samples):
+    headers = {"Authorization": f"Bearer {token}"}
+    while time.perf_counter() < stop_at:
+        started = time.perf_counter()
+        response = await client.get(f"/users/{user_id}", headers=headers)
+        samples.append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+
+
+async def run(args):
+    limits = httpx.Limits(max_connections=args.logins + args.readers)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as client:
+        for label, logins in (("idle", 0), ("login storm", args.logins)):
+            samples = []
+            stop_at = time.perf_counter() + args.duration
+            login_tasks = [login_worker(client, args.email, args.password, stop_at) for _ in range(logins)]
+            read_tasks = [read_worker(client, args.user_id, args.admin_token, stop_at, samples) for _ in range(args.readers)]
+            results = await asyncio.gather(*login_tasks, *read_tasks)
+            total_logins = sum(results[:logins])
+            print(
+                f"{label:>12}: {len(samples)} reads, {total_logins} logins | "
+                f"p50={statistics.median(samples):.1f}ms p99={percentile(samples, 99):.1f}ms max={max(samples):.1f}ms"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="p99 latency of GET /users/{id} during a login storm")
+    parser.add_argument("--base-url", default="http://localhost")
+    parser.add_argument("--admin-token", required=True, help="Bearer token of an ADMIN or MANAGER user")
+    parser.add_argument("--user-id", required=True, help="Id of the user fetched by the read workers")
+    parser.add_argument("--email", required=True, help="Email used by the login workers")
+    parser.add_argument("--password", required=True, help="Password used by the login workers")
+    parser.add_argument("--logins", type=int, default=32, help="Concurrent login workers")
+    parser.add_argument("--readers", type=int, default=4, help="Concurrent GET /users/{id} workers")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per phase")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+File: token_cache.py
+
+Overview:
+Compares the per-request cost of authenticating a bearer token with a full `jwt.decode`
+(signature, JSON parsing, claim validation) against the verified-token cache used by `get_current_user`.
+
+Usage:
+    python benchmarks/token_cache.py --requests 100000
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.jwt_service import create_access_token, decode_token, decode_token_cached, verified_token_cache
+
+
+def time_per_call(func, token, requests):
+    started = time.perf_counter()
+    for _ in range(requests):
+        func(token)
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cached vs uncached bearer token verification")
+    parser.add_argument("--requests", type=int, default=100000)
+    args = parser.parse_args()
+
+    token = create_access_token(data={"sub": "admin@example.com", "role": "admin"}, expires_delta=timedelta(minutes=15))
+    uncached = time_per_call(decode_token, token, args.requests)
+    cached = time_per_call(decode_token_cached, token, args.requests)
+    print(f"uncached: {uncached:.2f} us/request")
+    print(f"  cached: {cached:.2f} us/request ({uncached / cached:.1f}x faster, hit ratio {verified_token_cache.hit_ratio():.3f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import asyncio
+import pytest
+from app.utils.admission import AdmissionController, AdmissionRejectedError
+from app.utils.metrics import metrics
+
+@pytest.mark.asyncio
+async def test_admission_admits_up_to_concurrency():
+    controller = AdmissionController("test_admit", max_concurrency=2, max_queue=0, queue_timeout=0.1)
+    await controller.acquire()
+    await controller.acquire()
+    assert controller.active == 2
+    with pytest.raises(AdmissionRejectedError):
+        await controller.acquire()
+    assert metrics.get("admission.test_admit.shed") == 1
+    controller.release()
+    controller.release()
+    assert controller.active == 0
+
+@pytest.mark.asyncio
+async def test_admission_queues_and_hands_over_slot():
+    controller = AdmissionController("test_queue", max_concurrency=1, max_queue=1, queue_timeout=1)
+    await controller.acquire()
+    waiter = asyncio.ensure_future(controller.acquire())
+    await asyncio.sleep(0)
+    assert controller.waiting == 1
+    controller.release()
+    await waiter
+    assert controller.active == 1
+    assert metrics.get("admission.test_queue.queued") == 1
+    assert metrics.get("admission.test_queue.admitted") == 2
+    controller.release()
+    assert controller.active == 0
+
+@pytest.mark.asyncio
+async def test_admission_sheds_after_queue_deadline():
+    controller = AdmissionController("test_deadline", max_concurrency=1, max_queue=4, queue_timeout=0.01)
+    await controller.acquire()
+    with pytest.raises(AdmissionRejectedError):
+        await controller.acquire()
+    assert controller.waiting == 0
+    controller.release()
+    assert controller.active == 0
+
+@pytest.mark.asyncio
+async def test_login_sheds_with_retry_after(async_client, monkeypatch):
+    from app.utils import admission
+    controller = AdmissionController("login", max_concurrency=0, max_queue=0, queue_timeout=0.01)
+    monkeypatch.setitem(admission._controllers, "login", controller)
+    response = await async_client.post("/login/", data={"username": "a@example.com", "password": "x"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
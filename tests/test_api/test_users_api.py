@@ -1,11 +1,13 @@
-from builtins import str
+from builtins import range, str
+from uuid import uuid4
 import pytest
 from httpx import AsyncClient
+from app.dependencies import get_settings
 from app.main import app
 from app.models.user_model import User
 from app.utils.nickname_gen import generate_nickname
 from app.utils.security import hash_password
-from app.services.jwt_service import decode_token  # Import your FastAPI app
+from app.services.jwt_service import create_user_access_token, decode_token  # Import your FastAPI app
 
 # Example of a test function using the async_client fixture
 @pytest.mark.asyncio
@@ -142,6 +144,20 @@ async def test_login_locked_user(async_client, locked_user):
     response = await async_client.post("/login/", data=urlencode(form_data), headers={"Content-Type": "application/x-www-form-urlencoded"})
     assert response.status_code == 400
     assert "Account locked due to too many failed login attempts." in response.json().get("detail", "")
+
+@pytest.mark.asyncio
+async def test_login_sheds_load_when_hashing_queue_full(async_client, verified_user, monkeypatch):
+    from app.utils import security
+    # A hasher with no workers and no queue slots is permanently full
+    monkeypatch.setattr(security, "_password_hasher", security.PasswordHasher(workers=0, queue_size=0))
+    form_data = {
+        "username": verified_user.email,
+        "password": "MySuperPassword$1234"
+    }
+    response = await async_client.post("/login/", data=urlencode(form_data), headers={"Content-Type": "application/x-www-form-urlencoded"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(get_settings().admission_retry_after_seconds)
+
 @pytest.mark.asyncio
 async def test_delete_user_does_not_exist(async_client, admin_token):
     non_existent_user_id = "00000000-0000-0000-0000-000000000000"  # Valid UUID format
@@ -174,6 +190,116 @@ async def test_list_users_as_admin(async_client, admin_token):
     assert response.status_code == 200
     assert 'items' in response.json()
 
+@pytest.mark.asyncio
+async def test_list_users_defaults_to_offset_pages(async_client, admin_user, users_with_same_role_50_users):
+    headers = {"Authorization": f"Bearer {create_user_access_token(admin_user)}"}
+    body = (await async_client.get("/users/?limit=10", headers=headers)).json()
+    assert body["page"] == 1
+    assert body["next_cursor"] is None
+    hrefs = {link["rel"]: link["href"] for link in body["links"]}
+    assert "skip=0" in hrefs["self"] and "skip=10" in hrefs["next"] and "cursor" not in hrefs["next"]
+
+@pytest.mark.asyncio
+async def test_list_users_cursor_mode(async_client, admin_user, users_with_same_role_50_users):
+    headers = {"Authorization": f"Bearer {create_user_access_token(admin_user)}"}
+    body = (await async_client.get("/users/?mode=cursor&limit=10", headers=headers)).json()
+    assert body["page"] is None
+    assert body["next_cursor"] is not None
+    next_page = (await async_client.get(f"/users/?cursor={body['next_cursor']}&limit=10", headers=headers)).json()
+    assert {item["id"] for item in next_page["items"]}.isdisjoint(item["id"] for item in body["items"])
+
+@pytest.mark.asyncio
+async def test_retrieve_user_sparse_fields(async_client, admin_user):
+    headers = {"Authorization": f"Bearer {create_user_access_token(admin_user)}"}
+    response = await async_client.get(f"/users/{admin_user.id}?fields=id,email,role", headers=headers)
+    assert response.status_code == 200
+    assert response.json() == {"id": str(admin_user.id), "email": admin_user.email, "role": admin_user.role.value}
+
+@pytest.mark.asyncio
+async def test_list_users_sparse_fields(async_client, admin_user, users_with_same_role_50_users):
+    headers = {"Authorization": f"Bearer {create_user_access_token(admin_user)}"}
+    response = await async_client.get("/users/?fields=id,email&limit=5", headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["items"]) == 5
+    assert all(set(item) == {"id", "email"} for item in body["items"])
+    assert all("fields=id%2Cemail" in link["href"] for link in body["links"])
+
+@pytest.mark.asyncio
+async def test_list_users_unknown_field(async_client, admin_user):
+    headers = {"Authorization": f"Bearer {create_user_access_token(admin_user)}"}
+    response = await async_client.get("/users/?fields=id,hashed_password", headers=headers)
+    assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_fast_json_responses_match_standard(async_client, admin_user, monkeypatch):
+    from app.routers import user_routes
+    headers = {"Authorization": f"Bearer {create_user_access_token(admin_user)}"}
+    standard = await async_client.get(f"/users/{admin_user.id}", headers=headers)
+    standard_list = await async_client.get("/users/?limit=5", headers=headers)
+    monkeypatch.setattr(user_routes, "fast_json", True)
+    fast = await async_client.get(f"/users/{admin_user.id}", headers=headers)
+    fast_list = await async_client.get("/users/?limit=5", headers=headers)
+    assert fast.status_code == fast_list.status_code == 200
+    assert fast.json() == standard.json()
+    assert fast_list.json()["items"] == standard_list.json()["items"]
+
+@pytest.mark.asyncio
+async def test_retrieve_user_not_modified(async_client, admin_user):
+    headers = {"Authorization": f"Bearer {create_user_access_token(admin_user)}"}
+    response = await async_client.get(f"/users/{admin_user.id}", headers=headers)
+    etag = response.headers["ETag"]
+    response = await async_client.get(f"/users/{admin_user.id}", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+
+@pytest.mark.asyncio
+async def test_sparse_and_full_user_etags_differ(async_client, admin_user):
+    headers = {"Authorization": f"Bearer {create_user_access_token(admin_user)}"}
+    full_etag = (await async_client.get(f"/users/{admin_user.id}", headers=headers)).headers["ETag"]
+    response = await async_client.get(f"/users/{admin_user.id}?fields=id,email", headers={**headers, "If-None-Match": full_etag})
+    assert response.status_code == 200
+    sparse_etag = response.headers["ETag"]
+    assert sparse_etag != full_etag
+    response = await async_client.get(f"/users/{admin_user.id}?fields=id,email", headers={**headers, "If-None-Match": sparse_etag})
+    assert response.status_code == 304
+    response = await async_client.get(f"/users/{admin_user.id}", headers={**headers, "If-None-Match": sparse_etag})
+    assert response.status_code == 200
+
+@pytest.mark.asyncio
+async def test_list_users_not_modified(async_client, admin_user):
+    headers = {"Authorization": f"Bearer {create_user_access_token(admin_user)}"}
+    response = await async_client.get("/users/?limit=5", headers=headers)
+    etag = response.headers["ETag"]
+    response = await async_client.get("/users/?limit=5", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+
+@pytest.mark.asyncio
+async def test_update_user_if_match(async_client, verified_user, admin_user):
+    headers = {"Authorization": f"Bearer {create_user_access_token(admin_user)}"}
+    etag = (await async_client.get(f"/users/{verified_user.id}", headers=headers)).headers["ETag"]
+    response = await async_client.put(f"/users/{verified_user.id}", json={"bio": "First edit"}, headers={**headers, "If-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    # A second writer still holding the old ETag must not overwrite the first edit
+    response = await async_client.put(f"/users/{verified_user.id}", json={"bio": "Lost update"}, headers={**headers, "If-Match": etag})
+    assert response.status_code == 412
+
+@pytest.mark.asyncio
+async def test_logins_do_not_invalidate_etag(async_client, verified_user, admin_user):
+    headers = {"Authorization": f"Bearer {create_user_access_token(admin_user)}"}
+    etag = (await async_client.get(f"/users/{verified_user.id}", headers=headers)).headers["ETag"]
+    login = {"Content-Type": "application/x-www-form-urlencoded"}
+    failed = await async_client.post("/login/", data=urlencode({"username": verified_user.email, "password": "WrongPassword123!"}), headers=login)
+    assert failed.status_code == 401
+    succeeded = await async_client.post("/login/", data=urlencode({"username": verified_user.email, "password": "MySuperPassword$1234"}), headers=login)
+    assert succeeded.status_code == 200
+    # Login bookkeeping is not an edit, so the ETag read before it still matches
+    assert (await async_client.get(f"/users/{verified_user.id}", headers=headers)).headers["ETag"] == etag
+    response = await async_client.put(f"/users/{verified_user.id}", json={"bio": "Edited after a login"}, headers={**headers, "If-Match": etag})
+    assert response.status_code == 200
+
 @pytest.mark.asyncio
 async def test_list_users_as_manager(async_client, manager_token):
     response = await async_client.get(
@@ -189,3 +315,65 @@ async def test_list_users_unauthorized(async_client, user_token):
         headers={"Authorization": f"Bearer {user_token}"}
     )
     assert response.status_code == 403  # Forbidden, as expected for regular user
+
+@pytest.mark.asyncio
+async def test_refresh_token_rotation(async_client, verified_user):
+    form_data = {"username": verified_user.email, "password": "MySuperPassword$1234"}
+    login_response = await async_client.post("/login/", data=urlencode(form_data), headers={"Content-Type": "application/x-www-form-urlencoded"})
+    assert login_response.status_code == 200
+    refresh_token = login_response.json()["refresh_token"]
+
+    response = await async_client.post("/token/refresh", json={"refresh_token": refresh_token})
+    assert response.status_code == 200
+    data = response.json()
+    assert decode_token(data["access_token"])["sub"] == verified_user.email
+    assert data["refresh_token"] != refresh_token
+
+@pytest.mark.asyncio
+async def test_refresh_token_reuse_revokes_family(async_client, verified_user):
+    form_data = {"username": verified_user.email, "password": "MySuperPassword$1234"}
+    login_response = await async_client.post("/login/", data=urlencode(form_data), headers={"Content-Type": "application/x-www-form-urlencoded"})
+    first_token = login_response.json()["refresh_token"]
+    second_token = (await async_client.post("/token/refresh", json={"refresh_token": first_token})).json()["refresh_token"]
+
+    reuse_response = await async_client.post("/token/refresh", json={"refresh_token": first_token})
+    assert reuse_response.status_code == 401
+    # The replacement handed out before the reuse is revoked along with the rest of the family.
+    response = await async_client.post("/token/refresh", json={"refresh_token": second_token})
+    assert response.status_code == 401
+
+@pytest.mark.asyncio
+async def test_refresh_token_invalid(async_client):
+    response = await async_client.post("/token/refresh", json={"refresh_token": "not-a-real-token"})
+    assert response.status_code == 401
+
+@pytest.mark.asyncio
+async def test_access_token_revoked_after_password_reset(async_client, db_session, verified_user):
+    from app.services.user_service import UserService
+    form_data = {"username": verified_user.email, "password": "MySuperPassword$1234"}
+    login_response = await async_client.post("/login/", data=urlencode(form_data), headers={"Content-Type": "application/x-www-form-urlencoded"})
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+    # Authenticated but not allowed: the token itself is still accepted.
+    assert (await async_client.get("/users/", headers=headers)).status_code == 403
+
+    assert await UserService.reset_password(db_session, verified_user.id, "NewPassword123!")
+    response = await async_client.get("/users/", headers=headers)
+    assert response.status_code == 401
+
+@pytest.mark.asyncio
+async def test_batch_get_users(async_client, admin_user, verified_user):
+    headers = {"Authorization": f"Bearer {create_user_access_token(admin_user)}"}
+    unknown_id = uuid4()
+    ids = [str(verified_user.id), str(unknown_id), str(admin_user.id), str(verified_user.id)]
+    response = await async_client.post("/users/batch-get", json={"ids": ids}, headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["id"] for item in body["items"]] == [str(verified_user.id), str(admin_user.id)]
+    assert body["missing"] == [str(unknown_id)]
+
+@pytest.mark.asyncio
+async def test_batch_get_users_rejects_too_many_ids(async_client, admin_user):
+    headers = {"Authorization": f"Bearer {create_user_access_token(admin_user)}"}
+    ids = [str(uuid4()) for _ in range(get_settings().user_batch_get_max + 1)]
+    response = await async_client.post("/users/batch-get", json={"ids": ids}, headers=headers)
+    assert response.status_code == 422
@@ -0,0 +1,40 @@
+import time
+from app.utils.cache import TTLCache
+from app.utils.metrics import metrics
+
+def test_cache_returns_stored_value():
+    cache = TTLCache("test_basic", max_size=2, ttl=60)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert cache.get("missing") is None
+    assert metrics.get("cache.test_basic.hits") == 1
+    assert metrics.get("cache.test_basic.misses") == 1
+
+def test_cache_evicts_least_recently_used():
+    cache = TTLCache("test_lru", max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+def test_cache_expires_entries():
+    cache = TTLCache("test_ttl", max_size=2)
+    cache.set("a", 1, ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+def test_cache_ignores_non_positive_ttl():
+    cache = TTLCache("test_no_ttl", max_size=2)
+    cache.set("a", 1, ttl=-1)
+    cache.set("b", 2)
+    assert len(cache) == 0
+
+def test_cache_delete():
+    cache = TTLCache("test_delete", max_size=2, ttl=60)
+    cache.set("a", 1)
+    assert cache.delete("a") is True
+    assert cache.delete("a") is False
@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+
+from app.utils.dataloader import DataLoader
+
+pytestmark = pytest.mark.asyncio
+
+def make_loader(calls, max_batch_size=100):
+    async def batch_fn(keys):
+        calls.append(list(keys))
+        return {key: key * 10 for key in keys if key >= 0}
+    return DataLoader(batch_fn, max_batch_size=max_batch_size)
+
+async def test_concurrent_loads_share_one_batch():
+    calls = []
+    loader = make_loader(calls)
+    results = await asyncio.gather(loader.load(1), loader.load(2), loader.load(3))
+    assert results == [10, 20, 30]
+    assert calls == [[1, 2, 3]]
+
+async def test_missing_keys_resolve_to_none():
+    loader = make_loader([])
+    assert await loader.load_many([1, -1]) == [10, None]
+
+async def test_loads_are_memoized():
+    calls = []
+    loader = make_loader(calls)
+    await loader.load(1)
+    assert await asyncio.gather(loader.load(1), loader.load(2)) == [10, 20]
+    assert calls == [[1], [2]]
+
+async def test_batches_are_split_by_max_size():
+    calls = []
+    loader = make_loader(calls, max_batch_size=2)
+    assert await loader.load_many([1, 2, 3, 4, 5]) == [10, 20, 30, 40, 50]
+    assert calls == [[1, 2], [3, 4], [5]]
+
+async def test_batch_errors_reach_every_waiter():
+    async def failing(keys):
+        raise RuntimeError("database unavailable")
+    loader = DataLoader(failing)
+    results = await asyncio.gather(loader.load(1), loader.load(2), return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
@@ -0,0 +1,48 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from app.utils.etags import etag_matches, if_match_versions, list_etag, parse_user_etag, user_etag
+
+UPDATED_AT = datetime(2024, 5, 6, 7, 8, 9, 123456, tzinfo=timezone.utc)
+
+def test_user_etag_round_trips():
+    user_id = uuid4()
+    etag = user_etag(user_id, UPDATED_AT)
+    assert etag.startswith('W/"')
+    assert parse_user_etag(etag) == (user_id, UPDATED_AT)
+
+def test_user_etag_changes_with_version():
+    user_id = uuid4()
+    assert user_etag(user_id, UPDATED_AT) != user_etag(user_id, UPDATED_AT.replace(microsecond=123457))
+
+def test_sparse_user_etag_differs_but_keeps_the_version():
+    user_id = uuid4()
+    full, sparse = user_etag(user_id, UPDATED_AT), user_etag(user_id, UPDATED_AT, ("id", "email"))
+    assert not etag_matches(full, sparse)
+    assert not etag_matches(sparse, user_etag(user_id, UPDATED_AT, ("id", "role")))
+    assert etag_matches(sparse, user_etag(user_id, UPDATED_AT, ("id", "email")))
+    assert parse_user_etag(sparse) == (user_id, UPDATED_AT)
+
+def test_parse_rejects_foreign_tags():
+    assert parse_user_etag('"abc"') is None
+    assert parse_user_etag('W/"not-a-uuid.12"') is None
+
+def test_etag_matches_uses_weak_comparison():
+    etag = user_etag(uuid4(), UPDATED_AT)
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", {etag[2:]}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('W/"other"', etag)
+    assert not etag_matches(None, etag)
+
+def test_list_etag_is_stable_digest():
+    assert list_etag("page", 1, [2]) == list_etag("page", 1, [2])
+    assert list_etag("page", 1, [2]) != list_etag("page", 1, [3])
+
+def test_if_match_versions():
+    user_id = uuid4()
+    assert if_match_versions(None, user_id) is None
+    assert if_match_versions("*", user_id) is None
+    assert if_match_versions(user_etag(user_id, UPDATED_AT), user_id) == [UPDATED_AT]
+    assert if_match_versions(user_etag(uuid4(), UPDATED_AT), user_id) == []
+    assert if_match_versions('"garbage"', user_id) == []
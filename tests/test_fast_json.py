@@ -0,0 +1,37 @@
+import json
+import uuid
+from datetime import datetime, timezone
+
+from pydantic_core import Url
+
+from app.models.user_model import UserRole
+from app.schemas.pagination_schema import PaginationLink
+from app.utils import fast_json
+from app.utils.fast_json import FastJSONResponse, dumps
+
+def sample():
+    return {
+        "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        "role": UserRole.ADMIN,
+        "created_at": datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+        "links": [PaginationLink.model_construct(rel="self", href=Url("http://testserver/users/?limit=5"), method="GET")],
+    }
+
+def check(encoded):
+    decoded = json.loads(encoded)
+    assert decoded["id"] == "12345678-1234-5678-1234-567812345678"
+    assert decoded["role"] == "ADMIN"
+    assert decoded["created_at"].startswith("2024-01-02T03:04:05")
+    assert decoded["links"] == [{"rel": "self", "href": "http://testserver/users/?limit=5", "method": "GET"}]
+
+def test_dumps_encodes_read_model_types():
+    check(dumps(sample()))
+
+def test_dumps_without_orjson(monkeypatch):
+    monkeypatch.setattr(fast_json, "orjson", None)
+    check(dumps(sample()))
+
+def test_fast_json_response_renders_bytes():
+    response = FastJSONResponse(sample())
+    assert response.media_type == "application/json"
+    check(response.body)
@@ -0,0 +1,17 @@
+import pytest
+
+from app.utils.fieldsets import InvalidFieldsError, parse_fields
+
+ALLOWED = ("id", "email", "role", "nickname")
+
+def test_absent_or_blank_means_every_field():
+    assert parse_fields(None, ALLOWED) is None
+    assert parse_fields("", ALLOWED) is None
+    assert parse_fields(" , ", ALLOWED) is None
+
+def test_fields_keep_request_order_without_duplicates():
+    assert parse_fields("role, id,role,email", ALLOWED) == ("role", "id", "email")
+
+def test_unknown_fields_are_rejected():
+    with pytest.raises(InvalidFieldsError, match="hashed_password"):
+        parse_fields("id,hashed_password", ALLOWED)
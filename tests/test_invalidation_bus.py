@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+
+from app.dependencies import get_settings
+from app.utils.invalidation_bus import FakeHub, InvalidationBus, PostgresChannel
+
+pytestmark = pytest.mark.asyncio
+
+async def wait_until(condition, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+def make_bus(received, resets=None):
+    bus = InvalidationBus(min_backoff=0.01, max_backoff=0.05)
+    bus.subscribe("user", lambda key, version: received.append((key, version)))
+    if resets is not None:
+        bus.subscribe_reset(lambda: resets.append(True))
+    return bus
+
+async def test_other_workers_receive_invalidations():
+    hub = FakeHub()
+    received_a, received_b = [], []
+    bus_a, bus_b = make_bus(received_a), make_bus(received_b)
+    bus_a.start(hub.channel)
+    bus_b.start(hub.channel)
+    try:
+        await wait_until(lambda: bus_a.connected and bus_b.connected)
+        bus_a.publish("user", "42", 3)
+        await wait_until(lambda: received_b)
+        assert received_b == [("42", 3)]
+        assert received_a == []
+    finally:
+        await bus_a.stop()
+        await bus_b.stop()
+
+async def test_publish_while_disconnected_is_dropped():
+    received = []
+    bus = make_bus(received)
+    bus.publish("user", "42")
+    assert not bus.connected
+
+async def test_malformed_payloads_are_ignored():
+    received = []
+    bus = make_bus(received)
+    bus.handle("not json")
+    bus.handle('["a list"]')
+    bus.handle('{"e":"user","k":"7","o":"another-worker"}')
+    assert received == [("7", None)]
+
+async def test_reconnects_and_resets_after_a_lost_connection():
+    hub = FakeHub()
+    resets = []
+    bus = make_bus([], resets)
+    bus.start(hub.channel)
+    try:
+        await wait_until(lambda: bus.connected)
+        assert resets == []
+        hub.channels[0].drop()
+        await wait_until(lambda: bus.connected and resets)
+        assert len(hub.channels) == 1
+    finally:
+        await bus.stop()
+
+async def test_keeps_retrying_while_the_server_is_down():
+    attempts = []
+
+    def unreachable():
+        attempts.append(True)
+        raise ConnectionRefusedError("database is down")
+
+    bus = InvalidationBus(min_backoff=0.01, max_backoff=0.02)
+    bus.start(unreachable)
+    try:
+        await wait_until(lambda: len(attempts) >= 3)
+        assert not bus.connected
+    finally:
+        await bus.stop()
+
+async def test_postgres_channel_round_trip():
+    settings = get_settings()
+    received_a, received_b = [], []
+    bus_a, bus_b = make_bus(received_a), make_bus(received_b)
+    factory = lambda: PostgresChannel(settings.database_url, "cache_invalidation_test")
+    bus_a.start(factory)
+    bus_b.start(factory)
+    try:
+        await wait_until(lambda: bus_a.connected and bus_b.connected, timeout=5.0)
+        bus_a.publish("user", "42", 1)
+        await wait_until(lambda: received_b, timeout=5.0)
+        assert received_b == [("42", 1)]
+    finally:
+        await bus_a.stop()
+        await bus_b.stop()
@@ -49,3 +49,43 @@ def test_generate_pagination_links(mock_request):
     assert len(links) >= 4
     expected_self_url = "http://testserver/users?limit=5&skip=10"
     assert normalize_url(str(links[0].href)) == normalize_url(expected_self_url), "Self link should match expected URL"
+
+def test_generate_cursor_pagination_links(mock_request):
+    links = generate_pagination_links(mock_request, None, 5, 50, cursor="abc", next_cursor="def", prev_cursor="xyz")
+    hrefs = {link.rel: normalize_url(str(link.href)) for link in links}
+    assert hrefs["self"] == normalize_url("http://testserver/users?cursor=abc&limit=5")
+    assert hrefs["first"] == normalize_url("http://testserver/users?mode=cursor&limit=5")
+    assert hrefs["next"] == normalize_url("http://testserver/users?cursor=def&limit=5")
+    assert hrefs["prev"] == normalize_url("http://testserver/users?cursor=xyz&limit=5")
+    assert "last" not in hrefs
+
+def test_generate_cursor_pagination_links_last_page(mock_request):
+    links = generate_pagination_links(mock_request, None, 5, 50, cursor="abc", prev_cursor="xyz")
+    assert [link.rel for link in links] == ["self", "first", "prev"]
+
+def test_generate_pagination_links_without_total(mock_request):
+    links = generate_pagination_links(mock_request, 10, 5, None, has_more=True)
+    assert [link.rel for link in links] == ["self", "first", "next", "prev"]
+    links = generate_pagination_links(mock_request, 10, 5, None, has_more=False)
+    assert "next" not in [link.rel for link in links]
+
+def test_generate_pagination_links_keep_fields(mock_request):
+    links = generate_pagination_links(mock_request, 0, 5, 50, fields="id,email")
+    assert all("fields=id%2Cemail" in str(link.href) for link in links)
+
+def test_compiled_user_links_match_url_for(monkeypatch):
+    from starlette.requests import Request as StarletteRequest
+    from app.main import app
+    from app.utils import link_generation
+    request = StarletteRequest({
+        "type": "http", "method": "GET", "path": "/users/", "query_string": b"", "root_path": "",
+        "headers": [(b"host", b"testserver")], "scheme": "http", "server": ("testserver", 80),
+        "app": app, "router": app.router,
+    })
+    user_id = uuid4()
+    monkeypatch.setattr(link_generation, "_user_link_templates", None)
+    expected = [str(link.href) for link in create_user_links(user_id, request)]
+    link_generation.compile_link_templates(app)
+    links = create_user_links(user_id, request)
+    assert [str(link.href) for link in links] == expected
+    assert [link.rel for link in links] == ["self", "update", "delete"]
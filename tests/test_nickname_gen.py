@@ -0,0 +1,20 @@
+from app.utils.nickname_gen import generate_nickname, generate_nicknames, load_wordlist, nickname_space
+
+def test_generate_nickname_is_valid():
+    for _ in range(100):
+        nickname = generate_nickname()
+        assert nickname.isalnum()
+        assert 3 <= len(nickname) <= 50
+
+def test_generate_nicknames_are_distinct():
+    nicknames = generate_nicknames(50)
+    assert len(nicknames) == len(set(nicknames)) == 50
+
+def test_wordlists_are_lowercase_words():
+    for name in ("adjectives", "animals"):
+        words = load_wordlist(name)
+        assert len(words) >= 100
+        assert all(word.isalpha() and word.islower() for word in words)
+
+def test_nickname_space_is_large():
+    assert nickname_space() >= 100_000_000
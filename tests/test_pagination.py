@@ -0,0 +1,23 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+
+from app.utils.pagination import NEXT, PREV, InvalidCursorError, decode_cursor, encode_cursor
+
+def test_cursor_round_trip():
+    created_at = datetime(2024, 4, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+    user_id = uuid4()
+    cursor = encode_cursor(created_at, user_id, PREV)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, user_id, PREV)
+
+def test_cursor_defaults_to_next():
+    created_at = datetime.now(timezone.utc)
+    user_id = uuid4()
+    assert decode_cursor(encode_cursor(created_at, user_id))[2] == NEXT
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "", "eyJjIjoxfQ"])
+def test_invalid_cursor(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor)
@@ -1,7 +1,11 @@
 # test_security.py
 from builtins import RuntimeError, ValueError, isinstance, str
+import asyncio
 import pytest
-from app.utils.security import hash_password, verify_password
+from app.utils.security import (
+    HashingQueueFullError, PasswordHasher, calibrate_bcrypt_rounds, get_bcrypt_rounds, get_hash_rounds,
+    hash_password, needs_rehash, set_bcrypt_rounds, set_rehash_tolerance, verify_password
+)
 
 def test_hash_password():
     """Test that hashing password returns a bcrypt hashed string."""
@@ -65,3 +69,65 @@ def test_hash_password_internal_error(monkeypatch):
     with pytest.raises(ValueError):
         hash_password("test")
 
+@pytest.mark.asyncio
+async def test_hash_and_verify_password_async():
+    """Test the awaitable hashing API round-trips through the worker pool."""
+    hasher = PasswordHasher(workers=2, queue_size=2)
+    try:
+        hashed = await hasher.hash("secure_password", rounds=4)
+        assert hashed.startswith('$2b$04$')
+        assert await hasher.verify("secure_password", hashed) is True
+        assert await hasher.verify("incorrect_password", hashed) is False
+        assert hasher.pending == 0
+    finally:
+        hasher.shutdown()
+
+@pytest.mark.asyncio
+async def test_password_hasher_rejects_when_queue_full():
+    """Test that submissions beyond workers + queue_size fail fast."""
+    hasher = PasswordHasher(workers=1, queue_size=0)
+    try:
+        first = asyncio.ensure_future(hasher.hash("secure_password", rounds=10))
+        await asyncio.sleep(0)
+        with pytest.raises(HashingQueueFullError):
+            await hasher.hash("another_password", rounds=4)
+        assert (await first).startswith('$2b$10$')
+    finally:
+        hasher.shutdown()
+
+def test_get_hash_rounds_reads_embedded_cost():
+    """Test that the cost factor is parsed from the bcrypt prefix."""
+    assert get_hash_rounds(hash_password("secure_password", 5)) == 5
+    assert get_hash_rounds("invalid_hash_format") is None
+
+def test_needs_rehash_when_cost_differs():
+    """Test that hashes are flagged for rehash only when their cost differs from the target."""
+    hashed = hash_password("secure_password", 5)
+    assert needs_rehash(hashed, rounds=5) is False
+    assert needs_rehash(hashed, rounds=6) is True
+    assert needs_rehash("invalid_hash_format", rounds=6) is False
+
+def test_needs_rehash_tolerates_drift():
+    """Test that a tolerance keeps one cost step of drift from triggering a rehash."""
+    hashed = hash_password("secure_password", 5)
+    assert needs_rehash(hashed, rounds=6, tolerance=1) is False
+    assert needs_rehash(hashed, rounds=7, tolerance=1) is True
+    set_rehash_tolerance(1)
+    try:
+        assert needs_rehash(hashed, rounds=4) is False
+    finally:
+        set_rehash_tolerance(0)
+
+def test_calibrate_bcrypt_rounds_stays_within_bounds():
+    """Test that calibration never leaves the configured cost range."""
+    assert calibrate_bcrypt_rounds(target_ms=0, min_rounds=4, max_rounds=6) == 4
+    assert calibrate_bcrypt_rounds(target_ms=10_000, min_rounds=4, max_rounds=6) == 6
+
+def test_hash_password_uses_configured_rounds():
+    """Test that hashes default to the cost set through set_bcrypt_rounds."""
+    previous = get_bcrypt_rounds()
+    set_bcrypt_rounds(5)
+    try:
+        assert get_hash_rounds(hash_password("secure_password")) == 5
+    finally:
+        set_bcrypt_rounds(previous)
@@ -0,0 +1,40 @@
+from datetime import timedelta
+from app.services.jwt_service import create_access_token, decode_token_cached, verified_token_cache
+
+def test_decode_token_cached_hits_on_second_call():
+    token = create_access_token(data={"sub": "cached@example.com", "role": "admin"}, expires_delta=timedelta(minutes=5))
+    first = decode_token_cached(token)
+    assert first["sub"] == "cached@example.com"
+    assert decode_token_cached(token) is first
+
+def test_decode_token_cached_does_not_cache_invalid_tokens():
+    size = len(verified_token_cache)
+    assert decode_token_cached("not.a.token") is None
+    assert len(verified_token_cache) == size
+
+def test_decode_token_cached_rejects_expired_tokens():
+    token = create_access_token(data={"sub": "expired@example.com", "role": "admin"}, expires_delta=timedelta(seconds=-1))
+    assert decode_token_cached(token) is None
+
+async def test_tokens_without_revocation_claims_are_rejected(monkeypatch):
+    import pytest
+    from types import SimpleNamespace
+    from uuid import uuid4
+    from fastapi import HTTPException
+    from app.dependencies import get_current_user
+    from app.models.user_model import UserRole
+    from app.services.jwt_service import create_user_access_token
+    from app.services.token_version_service import TokenVersionService
+
+    async def get_version(session, user_id):
+        return 3
+    monkeypatch.setattr(TokenVersionService, "get_version", get_version)
+    legacy = create_access_token(data={"sub": "legacy@example.com", "role": "admin"})
+    with pytest.raises(HTTPException) as error:
+        await get_current_user(token=legacy, db=None)
+    assert error.value.status_code == 401
+    user = SimpleNamespace(id=uuid4(), email="current@example.com", role=UserRole.ADMIN, token_version=3)
+    assert (await get_current_user(token=create_user_access_token(user), db=None))["user_id"] == "current@example.com"
+    user.token_version = 2
+    with pytest.raises(HTTPException):
+        await get_current_user(token=create_user_access_token(user), db=None)
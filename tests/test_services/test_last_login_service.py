@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+
+from app.database import Database
+from app.services.last_login_service import LastLoginService
+from app.services.user_service import UserService
+
+pytestmark = pytest.mark.asyncio
+
+@pytest.fixture
+def empty_buffer(monkeypatch):
+    monkeypatch.setattr(LastLoginService, "_pending", {})
+    yield LastLoginService
+
+async def test_record_keeps_newest_timestamp(empty_buffer):
+    user_id = uuid4()
+    earlier = datetime.now(timezone.utc)
+    later = earlier + timedelta(seconds=5)
+    empty_buffer.record(user_id, later)
+    empty_buffer.record(user_id, earlier)
+    assert empty_buffer.pending() == 1
+    assert empty_buffer._pending[user_id] == later
+
+async def test_failed_flush_keeps_entries(empty_buffer, monkeypatch):
+    def unavailable():
+        raise ValueError("Database not initialized.")
+    monkeypatch.setattr(Database, "get_session_factory", unavailable)
+    user_id = uuid4()
+    empty_buffer.record(user_id, datetime.now(timezone.utc))
+    assert await empty_buffer.flush() == 0
+    assert empty_buffer.pending() == 1
+
+async def test_failed_flushes_keep_only_the_newest_entries(empty_buffer, monkeypatch):
+    def unavailable():
+        raise ValueError("Database not initialized.")
+    monkeypatch.setattr(Database, "get_session_factory", unavailable)
+    monkeypatch.setattr(LastLoginService, "max_pending", 3)
+    started = datetime.now(timezone.utc)
+    user_ids = [uuid4() for _ in range(5)]
+    for offset, user_id in enumerate(user_ids):
+        empty_buffer.record(user_id, started + timedelta(seconds=offset))
+    assert await empty_buffer.flush() == 0
+    assert set(empty_buffer._pending) == set(user_ids[2:])
+
+async def test_flush_writes_last_login(db_session, empty_buffer, verified_user):
+    logged_in_at = datetime.now(timezone.utc)
+    empty_buffer.record(verified_user.id, logged_in_at)
+    assert await empty_buffer.flush() == 1
+    assert empty_buffer.pending() == 0
+    db_session.expire_all()
+    user = await UserService.get_by_id(db_session, verified_user.id)
+    assert user.last_login_at == logged_in_at
@@ -0,0 +1,102 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from app.models.user_model import UserRole
+from app.models.user_read_model import UserReadModel
+from app.services.user_cache_service import UserCacheService
+from app.services.user_service import UserService
+from app.utils.cache import TTLCache
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(UserCacheService, "cache", TTLCache("users_test", max_size=100, ttl=60))
+
+def make_model(**overrides):
+    fields = {field: None for field in UserReadModel.__slots__}
+    fields.update(id=uuid4(), nickname="cleverpanda0042", email="cached@example.com", role=UserRole.AUTHENTICATED,
+                  hashed_password="$2b$12$secret", verification_token="token")
+    fields.update(overrides)
+    return UserReadModel.from_user(SimpleNamespace(**fields))
+
+def test_read_model_has_no_credentials():
+    model = make_model()
+    assert not hasattr(model, "hashed_password")
+    assert not hasattr(model, "verification_token")
+    with pytest.raises(AttributeError):
+        model.hashed_password = "leak"
+
+def test_lookup_by_id_email_and_nickname():
+    model = make_model()
+    UserCacheService.put(model)
+    assert UserCacheService.get_by_id(model.id) is model
+    assert UserCacheService.get_by_email(model.email) is model
+    assert UserCacheService.get_by_nickname(model.nickname) is model
+
+def test_old_email_misses_after_change():
+    model = make_model()
+    UserCacheService.put(model)
+    UserCacheService.put(make_model(id=model.id, email="renamed@example.com"))
+    assert UserCacheService.get_by_email("cached@example.com") is None
+    assert UserCacheService.get_by_email("renamed@example.com").id == model.id
+
+def test_invalidate_drops_every_key():
+    model = make_model()
+    UserCacheService.put(model)
+    UserCacheService.invalidate(model.id)
+    assert UserCacheService.get_by_id(model.id) is None
+    assert UserCacheService.get_by_email(model.email) is None
+    assert UserCacheService.get_by_nickname(model.nickname) is None
+
+def test_record_login_updates_cached_copy():
+    model = make_model()
+    UserCacheService.put(model)
+    logged_in_at = datetime.now(timezone.utc)
+    UserCacheService.record_login(model.id, logged_in_at)
+    assert UserCacheService.get_by_id(model.id).last_login_at == logged_in_at
+
+def test_load_that_raced_a_write_is_not_cached():
+    model = make_model()
+    generation = UserCacheService.generation()
+    UserCacheService.invalidate(model.id)
+    assert not UserCacheService.put_loaded(model, generation)
+    assert UserCacheService.get_by_id(model.id) is None
+    assert UserCacheService.put_loaded(model, UserCacheService.generation())
+    assert UserCacheService.get_by_id(model.id) is model
+
+def test_load_never_replaces_a_newer_copy():
+    fresh = make_model(updated_at=datetime(2024, 5, 2, tzinfo=timezone.utc), bio="fresh")
+    generation = UserCacheService.generation()
+    UserCacheService.put_loaded(fresh, generation)
+    stale = make_model(id=fresh.id, updated_at=datetime(2024, 5, 1, tzinfo=timezone.utc), bio="stale")
+    assert not UserCacheService.put_loaded(stale, generation)
+    assert UserCacheService.get_by_id(fresh.id).bio == "fresh"
+
+@pytest.mark.asyncio
+async def test_only_primary_reads_fill_the_cache(monkeypatch):
+    from unittest.mock import AsyncMock, MagicMock
+    from app.database import Database, Replica
+    replica_engine = object()
+    monkeypatch.setattr(Database, "_replicas", [Replica("r1", engine=replica_engine, session_factory=None)])
+    model = make_model()
+
+    def session_on(bind):
+        result = MagicMock()
+        result.first.return_value = tuple(model.as_dict().values())
+        return SimpleNamespace(bind=bind, info={}, execute=AsyncMock(return_value=result))
+
+    assert (await UserService._load_read_model(session_on(replica_engine), id=model.id)).id == model.id
+    assert UserCacheService.get_by_id(model.id) is None
+    await UserService._load_read_model(session_on(object()), id=model.id)
+    assert UserCacheService.get_by_id(model.id).id == model.id
+
+@pytest.mark.asyncio
+async def test_update_writes_through_to_cache(db_session, user):
+    cached = await UserService.get_read_model(db_session, user.id)
+    assert UserCacheService.get_by_id(user.id) is cached
+    await UserService.update(db_session, user.id, {"bio": "Written through"})
+    assert UserCacheService.get_by_id(user.id).bio == "Written through"
+    await UserService.delete(db_session, user.id)
+    assert UserCacheService.get_by_id(user.id) is None
@@ -1,9 +1,15 @@
 from builtins import range
+import asyncio
 import pytest
 from sqlalchemy import select
+from uuid import uuid4
+from app.database import Database
 from app.dependencies import get_settings
 from app.models.user_model import User
-from app.services.user_service import UserService
+from app.models.user_read_model import UserSummary
+from app.services import nickname_service, user_service
+from app.services.nickname_service import NicknameService
+from app.services.user_service import AccountLockedError, EmailAlreadyExistsError, UserService
 
 pytestmark = pytest.mark.asyncio
 
@@ -89,6 +95,14 @@ async def test_list_users_with_pagination(db_session, users_with_same_role_50_us
     assert len(users_page_2) == 10
     assert users_page_1[0].id != users_page_2[0].id
 
+# Test listings are column projections that never load credentials or enter the identity map
+async def test_list_users_returns_projections(db_session, users_with_same_role_50_users):
+    db_session.expunge_all()
+    users = await UserService.list_users(db_session, skip=0, limit=10)
+    assert all(isinstance(user, UserSummary) for user in users)
+    assert not hasattr(users[0], "hashed_password")
+    assert len(db_session.identity_map) == 0
+
 # Test registering a user with valid data
 async def test_register_user_with_valid_data(db_session, email_service):
     user_data = {
@@ -156,3 +170,204 @@ async def test_unlock_user_account(db_session, locked_user):
     assert unlocked, "The account should be unlocked"
     refreshed_user = await UserService.get_by_id(db_session, locked_user.id)
     assert not refreshed_user.is_locked, "The user should no longer be locked"
+
+# Test walking every user with keyset pagination, forwards and back
+async def test_list_users_by_cursor(db_session, users_with_same_role_50_users):
+    seen = []
+    users, next_cursor, prev_cursor = await UserService.list_users_by_cursor(db_session, limit=20)
+    assert prev_cursor is None
+    seen.extend(users)
+    while next_cursor:
+        users, next_cursor, prev_cursor = await UserService.list_users_by_cursor(db_session, limit=20, cursor=next_cursor)
+        assert prev_cursor is not None
+        seen.extend(users)
+    assert len(seen) == 50
+    assert len({user.id for user in seen}) == 50
+
+    previous_page, _, _ = await UserService.list_users_by_cursor(db_session, limit=20, cursor=prev_cursor)
+    assert [user.id for user in previous_page] == [user.id for user in seen[20:40]]
+
+# Test the exact count is cached and dropped when a user is created
+async def test_count_is_cached_until_create(db_session, users_with_same_role_50_users, email_service):
+    UserService.invalidate_count()
+    total = await UserService.count(db_session)
+    assert total >= 50
+    assert UserService.count_cache.get("users") == total
+
+    await UserService.create(db_session, {"email": "count_cache_user@example.com", "password": "CountCache123!"}, email_service)
+    assert UserService.count_cache.get("users") is None
+    assert await UserService.count(db_session) == total + 1
+
+# Test the planner estimate is a usable number even before ANALYZE
+async def test_estimated_count(db_session, users_with_same_role_50_users):
+    assert await UserService.estimated_count(db_session) >= 0
+
+# Test creating a user with an email that is already registered
+async def test_create_user_duplicate_email(db_session, email_service, user):
+    with pytest.raises(EmailAlreadyExistsError):
+        await UserService.create(db_session, {"email": user.email, "password": "Duplicate123!"}, email_service)
+
+# Test a nickname collision is retried with a fresh nickname
+async def test_create_user_retries_taken_nickname(db_session, email_service, user, monkeypatch):
+    monkeypatch.setattr(user_service, "generate_nickname", lambda: user.nickname)
+    created = await UserService.create(db_session, {"email": "nickname_retry@example.com", "password": "NickRetry123!"}, email_service)
+    assert created is not None
+    assert created.nickname != user.nickname
+    assert created.nickname.isalnum()
+
+# Test the nickname allocator skips candidates that are already taken
+async def test_allocate_nickname_skips_taken(db_session, user, monkeypatch):
+    monkeypatch.setattr(nickname_service, "generate_nicknames", lambda count: [user.nickname, "freenickname0001"])
+    assert await NicknameService.allocate(db_session) == "freenickname0001"
+
+# Test updating a user who does not exist
+async def test_update_user_does_not_exist(db_session):
+    assert await UserService.update(db_session, uuid4(), {"bio": "Nobody here"}) is None
+
+# Test the row returned by an update carries the new values and token version
+async def test_update_user_returns_fresh_row(db_session, user):
+    version = user.token_version
+    updated_user = await UserService.update(db_session, user.id, {"email": "returning_update@example.com", "bio": "Fresh"})
+    assert updated_user.bio == "Fresh"
+    assert updated_user.token_version == version + 1
+
+# Test a deleted user is gone
+async def test_delete_user_removes_row(db_session, user):
+    assert await UserService.delete(db_session, user.id) is True
+    assert await UserService.get_by_id(db_session, user.id) is None
+    assert await UserService.delete(db_session, user.id) is False
+
+# Test a locked account is reported without checking the password
+async def test_login_locked_user_raises(db_session, locked_user):
+    with pytest.raises(AccountLockedError):
+        await UserService.login_user(db_session, locked_user.email, "MySuperPassword$1234")
+
+# Test concurrent failed logins never lose an increment
+async def test_concurrent_failed_logins_are_counted(verified_user):
+    max_login_attempts = get_settings().max_login_attempts
+    session_factory = Database.get_session_factory()
+
+    async def attempt():
+        async with session_factory() as session:
+            try:
+                await UserService.login_user(session, verified_user.email, "WrongPassword!1")
+            except AccountLockedError:
+                return False
+            return True
+
+    checked = sum(await asyncio.gather(*(attempt() for _ in range(max_login_attempts * 4))))
+    async with session_factory() as session:
+        user = await UserService.get_by_email(session, verified_user.email)
+    assert user.is_locked
+    assert user.failed_login_attempts == checked
+    assert user.token_version == verified_user.token_version + 1
+
+# Test fetching many users by id and by email
+async def test_get_many_users(db_session, user, verified_user):
+    users = await UserService.get_many_by_ids(db_session, [verified_user.id, uuid4(), user.id])
+    assert [found.id for found in users] == [verified_user.id, user.id]
+    users = await UserService.get_many_by_emails(db_session, [user.email, "nobody@example.com"])
+    assert [found.id for found in users] == [user.id]
+    assert await UserService.get_many_by_ids(db_session, []) == []
+
+async def test_failed_read_discards_the_unit_of_work():
+    from unittest.mock import AsyncMock, MagicMock
+    from sqlalchemy.exc import OperationalError
+    from app.database import begin_unit_of_work, commit_write, finish_unit_of_work
+    session = MagicMock()
+    session.info = {}
+    session.flush = AsyncMock()
+    session.commit = AsyncMock()
+    session.rollback = AsyncMock()
+    session.execute = AsyncMock(side_effect=OperationalError("SELECT 1", {}, Exception("connection lost")))
+    begin_unit_of_work(session)
+    await commit_write(session)
+    with pytest.raises(OperationalError):
+        await UserService.get_by_id(session, uuid4())
+    await finish_unit_of_work(session)
+    assert session.commit.await_count == 0
+
+def _session_on(url, has_writes=False):
+    from types import SimpleNamespace
+    from sqlalchemy.engine import make_url
+    return SimpleNamespace(bind=SimpleNamespace(url=make_url(url)), info={"has_writes": has_writes}, closed=False)
+
+@pytest.fixture
+def own_sessions(monkeypatch):
+    """Shared loads open their sessions here, one per load, against the caller's database."""
+    from contextlib import asynccontextmanager
+    opened = []
+
+    def session_factory_for(session):
+        @asynccontextmanager
+        async def factory():
+            shared = _session_on(session.bind.url.render_as_string())
+            opened.append(shared)
+            yield shared
+            shared.closed = True
+        return factory
+    monkeypatch.setattr(Database, "session_factory_for", session_factory_for)
+    return opened
+
+async def test_shared_reads_are_only_shared_per_database(own_sessions):
+    primary, replica = _session_on("postgresql+asyncpg://primary/db"), _session_on("postgresql+asyncpg://replica/db")
+    release, calls = asyncio.Event(), []
+
+    def load(source):
+        async def run(session):
+            calls.append(source)
+            await release.wait()
+            return source, session.bind.url.host
+        return run
+
+    reads = [
+        UserService._shared_read(replica, ("count",), load("replica")),
+        UserService._shared_read(replica, ("count",), load("replica again")),
+        UserService._shared_read(primary, ("count",), load("primary")),
+        UserService._shared_read(_session_on("postgresql+asyncpg://primary/db", has_writes=True), ("count",), load("own writes")),
+    ]
+    tasks = [asyncio.ensure_future(read) for read in reads]
+    await asyncio.sleep(0)
+    release.set()
+    assert await asyncio.gather(*tasks) == [("replica", "replica"), ("replica", "replica"), ("primary", "primary"), ("own writes", "primary")]
+    assert sorted(calls) == ["own writes", "primary", "replica"]
+    assert len(own_sessions) == 2 and all(session.closed for session in own_sessions)
+
+async def test_shared_read_survives_its_leader_being_cancelled(own_sessions):
+    leader_session, follower_session = _session_on("postgresql+asyncpg://replica/db"), _session_on("postgresql+asyncpg://replica/db")
+    release = asyncio.Event()
+
+    async def load(session):
+        await release.wait()
+        assert session is not leader_session and not session.closed
+        return "loaded"
+
+    leader = asyncio.ensure_future(UserService._shared_read(leader_session, ("count",), load))
+    await asyncio.sleep(0)
+    follower = asyncio.ensure_future(UserService._shared_read(follower_session, ("count",), load))
+    await asyncio.sleep(0)
+    leader.cancel()
+    # The leader's request is over and its session would be closed now
+    leader_session.closed = True
+    release.set()
+    assert await follower == "loaded"
+    assert leader.cancelled()
+
+async def test_concurrent_read_model_lookups_share_one_query(monkeypatch):
+    from types import SimpleNamespace
+    from unittest.mock import AsyncMock, MagicMock
+    from app.models.user_read_model import UserReadModel
+    from app.services.user_cache_service import UserCacheService
+    from app.utils.cache import TTLCache
+    monkeypatch.setattr(UserCacheService, "cache", TTLCache("users_test", max_size=100, ttl=60))
+    ids = [uuid4(), uuid4()]
+    result = MagicMock()
+    result.all.return_value = [tuple(user_id if field == "id" else None for field in UserReadModel.__slots__) for user_id in ids]
+    session = SimpleNamespace(bind=None, info={}, execute=AsyncMock(return_value=result))
+    models = await asyncio.gather(*(UserService.get_read_model(session, user_id) for user_id in ids))
+    assert [model.id for model in models] == ids
+    assert session.execute.await_count == 1
+    # Only the read model's columns are selected, never the password hash
+    selected = [column.name for column in session.execute.await_args.args[0].selected_columns]
+    assert selected == list(UserReadModel.__slots__)
+    assert UserService.loader(session) is UserService.loader(session)
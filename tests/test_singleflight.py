@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from app.utils.metrics import metrics
+from app.utils.singleflight import SingleFlight
+
+pytestmark = pytest.mark.asyncio
+
+def make_call(calls, release, value):
+    async def fn():
+        calls.append(value)
+        await release.wait()
+        return value
+    return fn
+
+async def test_identical_concurrent_calls_share_one_execution():
+    flights = SingleFlight("test_share")
+    calls, release = [], asyncio.Event()
+    waiters = [asyncio.ensure_future(flights.do("key", make_call(calls, release, 42))) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+    assert await asyncio.gather(*waiters) == [42] * 5
+    assert calls == [42]
+    assert metrics.get("singleflight.test_share.executed") == 1
+    assert metrics.get("singleflight.test_share.deduplicated") == 4
+
+async def test_different_keys_run_separately():
+    flights = SingleFlight("test_keys")
+    calls, release = [], asyncio.Event()
+    release.set()
+    assert await asyncio.gather(flights.do(1, make_call(calls, release, 1)), flights.do(2, make_call(calls, release, 2))) == [1, 2]
+    assert sorted(calls) == [1, 2]
+
+async def test_results_are_not_cached_after_completion():
+    flights = SingleFlight("test_no_cache")
+    calls, release = [], asyncio.Event()
+    release.set()
+    await flights.do("key", make_call(calls, release, 1))
+    await flights.do("key", make_call(calls, release, 2))
+    assert calls == [1, 2]
+
+async def test_errors_reach_every_waiter():
+    flights = SingleFlight("test_errors")
+    release = asyncio.Event()
+    async def failing():
+        await release.wait()
+        raise RuntimeError("boom")
+    waiters = [asyncio.ensure_future(flights.do("key", failing)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+async def test_cancelled_caller_does_not_cancel_the_shared_call():
+    flights = SingleFlight("test_cancel")
+    calls, release = [], asyncio.Event()
+    first = asyncio.ensure_future(flights.do("key", make_call(calls, release, 7)))
+    second = asyncio.ensure_future(flights.do("key", make_call(calls, release, 7)))
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+    assert await second == 7
+    assert calls == [7]